@@ -4,21 +4,28 @@ from datetime import datetime
 from collections import Counter
 import pandas as pd
 from typing import Dict, List, Any
+from config import Config
+from whatsapp_metrics import response_metrics, conversation_arrays
+from keyword_matcher import KeywordMatcher
+from email_features import extract_features
 
 class AIAnalyzer:
     def __init__(self):
-        self.keywords = {
-            'productivity': ['completed', 'finished', 'delivered', 'implemented', 'fixed', 'resolved', 'deployed'],
-            'communication': ['meeting', 'call', 'discussion', 'presentation', 'review', 'feedback'],
-            'development': ['code', 'bug', 'feature', 'commit', 'merge', 'deploy', 'test', 'debug'],
-            'support': ['help', 'assist', 'support', 'issue', 'problem', 'question', 'solution'],
-            'planning': ['plan', 'schedule', 'roadmap', 'strategy', 'goal', 'objective', 'milestone'],
-            'client_work': ['client', 'customer', 'user', 'requirement', 'specification', 'delivery']
+        self.issue_keywords = {
+            'technical': ['error', 'bug', 'not working', 'problem', 'issue', 'fail'],
+            'billing': ['payment', 'charge', 'bill', 'invoice', 'cost', 'price'],
+            'service': ['slow', 'late', 'delay', 'cancel', 'refund'],
+            'information': ['how to', 'help', 'question', 'explain', 'understand']
+        }
+        self.satisfaction_keywords = {
+            'positive': ['thank', 'great', 'perfect', 'excellent', 'good', 'satisfied'],
+            'negative': ['bad', 'terrible', 'awful', 'disappointed', 'angry', 'frustrated']
         }
         
-        self.urgency_indicators = ['urgent', 'asap', 'immediate', 'critical', 'emergency', 'priority']
-        self.positive_indicators = ['success', 'completed', 'approved', 'good', 'excellent', 'perfect']
-        self.negative_indicators = ['failed', 'error', 'problem', 'issue', 'bug', 'delayed']
+        # Conversation classifiers read their keyword hits from one pass of this matcher
+        groups = {('issue', issue): keywords for issue, keywords in self.issue_keywords.items()}
+        groups.update({('satisfaction', level): keywords for level, keywords in self.satisfaction_keywords.items()})
+        self.matcher = KeywordMatcher(groups)
     
     def analyze_emails(self, email_data):
         """AI-powered email analysis"""
@@ -33,7 +40,11 @@ class AIAnalyzer:
             'insights': []
         }
         
-        all_emails = email_data.get('sent', []) + email_data.get('received', [])
+        # Use the collector's shared message table when present instead of copying lists
+        if 'messages' in email_data:
+            all_emails = email_data['messages'].values()
+        else:
+            all_emails = email_data.get('sent', []) + email_data.get('received', [])
         analysis['total_emails'] = len(all_emails)
         
         # Analyze each email
@@ -42,26 +53,22 @@ class AIAnalyzer:
         urgencies = []
         
         for email in all_emails:
-            subject = email.get('subject', '').lower()
-            body = email.get('body', '').lower()
-            content = f"{subject} {body}"
+            # Every label comes from one pass over the email, cached on it for the other consumers
+            features = extract_features(email)
             
             # Category analysis
-            category = self._categorize_content(content)
-            analysis['categories'][category] = analysis['categories'].get(category, 0) + 1
+            analysis['categories'][features.category] = analysis['categories'].get(features.category, 0) + 1
             
             # Sentiment analysis
-            sentiment = self._analyze_sentiment(content)
-            analysis['sentiment_analysis'][sentiment] += 1
-            sentiments.append(sentiment)
+            analysis['sentiment_analysis'][features.sentiment] += 1
+            sentiments.append(features.sentiment)
             
             # Urgency analysis
-            urgency = self._analyze_urgency(content)
-            analysis['urgency_levels'][urgency] += 1
-            urgencies.append(urgency)
+            analysis['urgency_levels'][features.urgency] += 1
+            urgencies.append(features.urgency)
             
             # Extract topics
-            topics.extend(self._extract_topics(content))
+            topics.extend(features.topics)
         
         # Key topics analysis
         topic_counter = Counter(topics)
@@ -129,7 +136,6 @@ class AIAnalyzer:
         
         # Analyze each conversation
         issue_types = []
-        response_times = []
         satisfaction_indicators = []
         
         for conv in conversations:
@@ -138,22 +144,21 @@ class AIAnalyzer:
             if not messages:
                 continue
             
+            # Conversations include agent replies, whose wording says nothing about the customer
+            customer_messages = [msg for msg in messages if msg.get('is_customer', True)]
+            
             # Extract issue types
-            conv_content = ' '.join([msg.get('message', '') for msg in messages])
+            conv_content = ' '.join([msg.get('message', '') for msg in customer_messages])
             issues = self._extract_customer_issues(conv_content)
             issue_types.extend(issues)
             
-            # Analyze response efficiency
-            response_metrics = self._analyze_response_time(conv)
-            response_times.append(response_metrics)
-            
             # Customer satisfaction indicators
-            satisfaction = self._analyze_customer_satisfaction(messages)
+            satisfaction = self._analyze_customer_satisfaction(customer_messages)
             satisfaction_indicators.append(satisfaction)
         
         # Compile analysis
         analysis['common_issues'] = Counter(issue_types).most_common(10)
-        analysis['response_efficiency'] = self._compile_response_metrics(response_times)
+        analysis['response_efficiency'] = self._compile_response_metrics(whatsapp_data)
         analysis['customer_satisfaction'] = self._compile_satisfaction_metrics(satisfaction_indicators)
         analysis['conversation_insights'] = self._generate_conversation_insights(conversations)
         analysis['improvement_suggestions'] = self._generate_support_recommendations(analysis)
@@ -203,50 +208,6 @@ class AIAnalyzer:
         
         return report
     
-    def _categorize_content(self, content):
-        """Categorize content using AI-like keyword matching"""
-        scores = {}
-        for category, keywords in self.keywords.items():
-            score = sum(1 for keyword in keywords if keyword in content)
-            scores[category] = score
-        
-        if not scores or max(scores.values()) == 0:
-            return 'general'
-        
-        return max(scores, key=scores.get)
-    
-    def _analyze_sentiment(self, content):
-        """Simple sentiment analysis"""
-        positive_count = sum(1 for word in self.positive_indicators if word in content)
-        negative_count = sum(1 for word in self.negative_indicators if word in content)
-        
-        if positive_count > negative_count:
-            return 'positive'
-        elif negative_count > positive_count:
-            return 'negative'
-        else:
-            return 'neutral'
-    
-    def _analyze_urgency(self, content):
-        """Analyze urgency level"""
-        urgency_count = sum(1 for word in self.urgency_indicators if word in content)
-        
-        if urgency_count >= 2:
-            return 'high'
-        elif urgency_count == 1:
-            return 'medium'
-        else:
-            return 'low'
-    
-    def _extract_topics(self, content):
-        """Extract key topics from content"""
-        # Simple topic extraction using keywords
-        topics = []
-        for category, keywords in self.keywords.items():
-            if any(keyword in content for keyword in keywords):
-                topics.append(category)
-        return topics
-    
     def _analyze_communication_patterns(self, emails):
         """Analyze email communication patterns"""
         patterns = {
@@ -426,72 +387,18 @@ class AIAnalyzer:
     
     def _extract_customer_issues(self, content):
         """Extract customer issues from conversation content"""
-        issue_keywords = {
-            'technical': ['error', 'bug', 'not working', 'problem', 'issue', 'fail'],
-            'billing': ['payment', 'charge', 'bill', 'invoice', 'cost', 'price'],
-            'service': ['slow', 'late', 'delay', 'cancel', 'refund'],
-            'information': ['how to', 'help', 'question', 'explain', 'understand']
-        }
-        
-        issues = []
-        content_lower = content.lower()
-        
-        for issue_type, keywords in issue_keywords.items():
-            if any(keyword in content_lower for keyword in keywords):
-                issues.append(issue_type)
-        
-        return issues
-    
-    def _analyze_response_time(self, conversation):
-        """Analyze response time for a conversation"""
-        messages = conversation.get('messages', [])
-        if len(messages) < 2:
-            return {'average_response_time': 0, 'response_count': 0}
-        
-        # Simplified response time calculation
-        response_times = []
-        for i in range(1, len(messages)):
-            try:
-                curr_time = messages[i]['datetime']
-                prev_time = messages[i-1]['datetime']
-                
-                if isinstance(curr_time, str):
-                    curr_time = datetime.fromisoformat(curr_time)
-                if isinstance(prev_time, str):
-                    prev_time = datetime.fromisoformat(prev_time)
-                
-                diff = (curr_time - prev_time).total_seconds() / 60  # minutes
-                response_times.append(diff)
-            except:
-                continue
-        
-        avg_response = sum(response_times) / len(response_times) if response_times else 0
-        
-        return {
-            'average_response_time': avg_response,
-            'response_count': len(response_times)
-        }
+        hits = self.matcher.count(content.lower())
+        return [issue_type for issue_type in self.issue_keywords if hits[('issue', issue_type)]]
     
     def _analyze_customer_satisfaction(self, messages):
         """Analyze customer satisfaction indicators"""
-        satisfaction_keywords = {
-            'positive': ['thank', 'great', 'perfect', 'excellent', 'good', 'satisfied'],
-            'negative': ['bad', 'terrible', 'awful', 'disappointed', 'angry', 'frustrated']
-        }
-        
         positive_count = 0
         negative_count = 0
         
         for message in messages:
-            content = message.get('message', '').lower()
-            
-            for keyword in satisfaction_keywords['positive']:
-                if keyword in content:
-                    positive_count += 1
-            
-            for keyword in satisfaction_keywords['negative']:
-                if keyword in content:
-                    negative_count += 1
+            hits = self.matcher.count(message.get('message', '').lower())
+            positive_count += hits[('satisfaction', 'positive')]
+            negative_count += hits[('satisfaction', 'negative')]
         
         if positive_count > negative_count:
             return 'satisfied'
@@ -500,19 +407,14 @@ class AIAnalyzer:
         else:
             return 'neutral'
     
-    def _compile_response_metrics(self, response_times):
+    def _compile_response_metrics(self, whatsapp_data):
         """Compile response time metrics"""
-        if not response_times:
-            return {'average_response_time': 0, 'total_responses': 0}
-        
-        total_time = sum(rt['average_response_time'] for rt in response_times)
-        total_responses = sum(rt['response_count'] for rt in response_times)
+        # The collector already computed them over its columnar store
+        if whatsapp_data.get('response_times'):
+            return whatsapp_data['response_times']
         
-        return {
-            'average_response_time': total_time / len(response_times),
-            'total_responses': total_responses,
-            'response_efficiency': 'excellent' if total_time / len(response_times) < 30 else 'good' if total_time / len(response_times) < 60 else 'needs_improvement'
-        }
+        conversations = whatsapp_data.get('conversations', [])
+        return response_metrics(*conversation_arrays(conversations), len(conversations), Config.WHATSAPP_SLA_MINUTES)
     
     def _compile_satisfaction_metrics(self, satisfaction_indicators):
         """Compile customer satisfaction metrics"""
@@ -553,6 +455,10 @@ class AIAnalyzer:
         if response_efficiency == 'needs_improvement':
             recommendations.append("Improve response times to enhance customer satisfaction")
         
+        unanswered = analysis.get('response_efficiency', {}).get('unanswered_conversations', 0)
+        if unanswered:
+            recommendations.append(f"Reply to the {unanswered} customer conversations left unanswered")
+        
         satisfaction_rate = analysis.get('customer_satisfaction', {}).get('satisfaction_rate', 0)
         if satisfaction_rate < 70:
             recommendations.append("Focus on improving customer satisfaction through better service quality")
@@ -724,9 +630,10 @@ class AIAnalyzer:
             response_metrics = whatsapp_analysis.get('response_efficiency', {})
             response_eff = response_metrics.get('response_efficiency', 'good')
             
+            # A period without conversations ('no_data') keeps the neutral default
             if response_eff == 'excellent':
                 service['response_efficiency'] = 90
-            elif response_eff == 'good':
+            elif response_eff in ('good', 'no_data'):
                 service['response_efficiency'] = 70
             else:
                 service['response_efficiency'] = 40
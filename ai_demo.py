@@ -207,8 +207,9 @@ def create_sample_data():
                     'message_count': 8,
                     'topics': ['technical_support'],
                     'messages': [
-                        {'message': 'Hi, I need help with installation', 'datetime': datetime.now() - timedelta(days=1)},
-                        {'message': 'Thank you for the help, it works perfectly now!', 'datetime': datetime.now() - timedelta(days=1, hours=-1)}
+                        {'message': 'Hi, I need help with installation', 'datetime': datetime.now() - timedelta(days=1), 'is_customer': True},
+                        {'message': 'Sure, please run the installer as administrator', 'datetime': datetime.now() - timedelta(days=1, minutes=-20), 'is_customer': False},
+                        {'message': 'Thank you for the help, it works perfectly now!', 'datetime': datetime.now() - timedelta(days=1, hours=-1), 'is_customer': True}
                     ]
                 },
                 {
@@ -218,8 +219,9 @@ def create_sample_data():
                     'message_count': 5,
                     'topics': ['billing'],
                     'messages': [
-                        {'message': 'Question about my invoice', 'datetime': datetime.now() - timedelta(days=2)},
-                        {'message': 'Great, that clarifies everything. Thanks!', 'datetime': datetime.now() - timedelta(days=2, hours=-1)}
+                        {'message': 'Question about my invoice', 'datetime': datetime.now() - timedelta(days=2), 'is_customer': True},
+                        {'message': 'The second charge is the annual plan renewal', 'datetime': datetime.now() - timedelta(days=2, minutes=-50), 'is_customer': False},
+                        {'message': 'Great, that clarifies everything. Thanks!', 'datetime': datetime.now() - timedelta(days=2, hours=-1), 'is_customer': True}
                     ]
                 }
             ],
@@ -0,0 +1,91 @@
+"""Benchmark fused email feature extraction against the separate analyzer, collector and report classifiers
+
+Usage: python benchmarks/email_labels.py [email count]
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from email_features import (
+    CATEGORY_KEYWORDS, COLLECTOR_CATEGORIES, NEGATIVE_INDICATORS, POSITIVE_INDICATORS, REPORT_CATEGORIES,
+    URGENCY_INDICATORS, extract_features
+)
+
+DENSITIES = (0.02, 0.2, 0.5)
+BODY_WORDS = (30, 300)
+FILLER = (
+    'the', 'team', 'we', 'will', 'send', 'update', 'about', 'next', 'week', 'please', 'see', 'attached',
+    'thanks', 'for', 'your', 'time', 'regarding', 'project', 'notes', 'status', 'today', 'office', 'hola',
+    'morning', 'document', 'version', 'changes', 'sent', 'email', 'reply', 'confirm', 'monday', 'friday'
+)
+REPEATS = 5
+
+def build_emails(count, keywords, density, body_words):
+    """Build emails where roughly density of the subject and body words are keywords"""
+    rnd = random.Random(count)
+    words = lambda n: ' '.join(rnd.choice(keywords) if rnd.random() < density else rnd.choice(FILLER)
+                               for _ in range(n))
+    # Bodies start on a new line, so no keyword spans the subject and body when they are searched unseparated
+    return [
+        {'subject': words(rnd.randint(3, 10)).capitalize(),
+         'body': '\n' + words(rnd.randint(body_words // 2, body_words))}
+        for _ in range(count)
+    ]
+
+def scan_features(email):
+    """Label an email the way the analyzer, collector and report generator each did, one scan per keyword"""
+    subject = email.get('subject', '').lower()
+    body = email.get('body', '').lower()
+    content = f'{subject} {body}'
+    
+    scores = {category: sum(1 for keyword in keywords if keyword in content)
+              for category, keywords in CATEGORY_KEYWORDS.items()}
+    category = max(scores, key=scores.get) if max(scores.values()) else 'general'
+    positive = sum(1 for word in POSITIVE_INDICATORS if word in content)
+    negative = sum(1 for word in NEGATIVE_INDICATORS if word in content)
+    sentiment = 'positive' if positive > negative else 'negative' if negative > positive else 'neutral'
+    urgency = sum(1 for word in URGENCY_INDICATORS if word in content)
+    urgency = 'high' if urgency >= 2 else 'medium' if urgency == 1 else 'low'
+    topics = tuple(category for category, keywords in CATEGORY_KEYWORDS.items()
+                   if any(keyword in content for keyword in keywords))
+    
+    # The collector and report generator searched the subject and body without a separator
+    collector_category = next((category for category, words in COLLECTOR_CATEGORIES
+                               if any(word in subject + body for word in words)), 'other')
+    report_category = next((category for category, words in REPORT_CATEGORIES
+                            if any(word in subject + body for word in words)), 'General')
+    return category, sentiment, urgency, topics, collector_category, report_category
+
+def best_rate(func, emails):
+    """Get the best emails-per-second rate of func over several runs, each on fresh copies of the emails"""
+    best = None
+    for _ in range(REPEATS):
+        batch = [dict(email) for email in emails]
+        start = time.perf_counter()
+        for email in batch:
+            func(email)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return len(emails) / best
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 3000
+    keywords = sorted({keyword for keywords in CATEGORY_KEYWORDS.values() for keyword in keywords}
+                      | set(URGENCY_INDICATORS) | set(POSITIVE_INDICATORS) | set(NEGATIVE_INDICATORS)
+                      | {word for _, words in COLLECTOR_CATEGORIES + REPORT_CATEGORIES for word in words})
+    
+    print(f'{"body words":>10} {"density":>8} {"scans/s":>10} {"fused/s":>10} {"speedup":>8}')
+    for body_words in BODY_WORDS:
+        for density in DENSITIES:
+            emails = build_emails(count, keywords, density, body_words)
+            # Labels must be identical to the separate classifiers'
+            assert all(tuple(extract_features(dict(email))) == scan_features(email) for email in emails)
+            
+            before = best_rate(scan_features, emails)
+            after = best_rate(extract_features, emails)
+            print(f'{body_words:>10} {density:>8.2f} {before:>10,.0f} {after:>10,.0f} {after / before:>7.2f}x')
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file
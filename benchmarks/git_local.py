@@ -0,0 +1,68 @@
+"""Benchmark LocalGitCollector on a synthetic repository with 100k commits
+
+Usage: python benchmarks/git_local.py [commit count] [repo path]
+The repository is built with git fast-import and reused when the path already exists.
+"""
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from git_local_collector import LocalGitCollector
+
+AUTHOR = 'Bench Author <bench@example.com>'
+# One commit every ten minutes, ending at this epoch second
+LAST_COMMIT = 1790000000
+INTERVAL = 600
+FILES = 50
+
+def fast_import_stream(commit_count):
+    """Yield a fast-import stream where every commit rewrites one of FILES files"""
+    for i in range(commit_count):
+        timestamp = LAST_COMMIT - (commit_count - 1 - i) * INTERVAL
+        message = f'Change {i}: update module {i % FILES}\n'.encode()
+        content = ''.join(f'line {i} {n}\n' for n in range(i % 7 + 1)).encode()
+        yield b'commit refs/heads/main\n'
+        yield f'committer {AUTHOR} {timestamp} +0000\n'.encode()
+        yield b'data %d\n%s' % (len(message), message)
+        yield b'M 644 inline src/module_%d.py\n' % (i % FILES)
+        yield b'data %d\n%s\n' % (len(content), content)
+
+def build_repo(path, commit_count):
+    """Create the synthetic repository at path"""
+    subprocess.run(['git', 'init', '-q', '-b', 'main', path], check=True)
+    subprocess.run(['git', '-C', path, 'config', 'user.email', 'bench@example.com'], check=True)
+    process = subprocess.Popen(['git', '-C', path, 'fast-import', '--quiet'], stdin=subprocess.PIPE)
+    for chunk in fast_import_stream(commit_count):
+        process.stdin.write(chunk)
+    process.stdin.close()
+    if process.wait():
+        raise RuntimeError('git fast-import failed')
+    subprocess.run(['git', '-C', path, 'reset', '-q', '--hard', 'main'], check=True)
+
+def main():
+    commit_count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    path = sys.argv[2] if len(sys.argv) > 2 else os.path.join(tempfile.gettempdir(), f'synthetic_repo_{commit_count}')
+    
+    if not os.path.exists(path):
+        start = time.perf_counter()
+        build_repo(path, commit_count)
+        print(f'Built {commit_count} commits in {path} in {time.perf_counter() - start:.1f}s')
+    
+    collector = LocalGitCollector([path])
+    first = datetime.fromtimestamp(LAST_COMMIT - commit_count * INTERVAL)
+    last = datetime.fromtimestamp(LAST_COMMIT + INTERVAL)
+    
+    start = time.perf_counter()
+    commits = collector.get_commits(first, last)
+    elapsed = time.perf_counter() - start
+    
+    additions = sum(commit['additions'] for commit in commits)
+    print(f'{len(commits)} commits, {additions} additions in {elapsed:.2f}s '
+          f'({len(commits) / elapsed:,.0f} commits/s)')
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file
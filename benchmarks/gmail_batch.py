@@ -0,0 +1,144 @@
+"""Benchmark batched Gmail message fetching against a local stand-in Gmail server
+
+Usage: python benchmarks/gmail_batch.py [message counts...]
+"""
+import json
+import os
+import re
+import sys
+import threading
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+import googleapiclient
+import httplib2
+from googleapiclient.discovery import build_from_document
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from email_collector import EmailCollector, GMAIL_MAX_BATCH_SIZE
+from request_scheduler import RequestScheduler
+
+# Each stand-in call waits this long, roughly a Gmail round trip
+LATENCY = 0.02
+GET_PATTERN = re.compile(r'GET /gmail/v1/users/[^/]+/messages/([^?\s]+)')
+
+class GmailStandIn(BaseHTTPRequestHandler):
+    """Serve messages.list, messages.get and batch calls over a fixed set of message ids"""
+    message_count = 0
+    counts = {}
+    lock = threading.Lock()
+    
+    def log_message(self, format, *args):
+        pass
+    
+    def _count(self, name):
+        with self.lock:
+            self.counts[name] = self.counts.get(name, 0) + 1
+    
+    def _send(self, body, content_type='application/json'):
+        time.sleep(LATENCY)
+        body = body.encode()
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    @staticmethod
+    def message(msg_id):
+        """Build a metadata-format message"""
+        return {
+            'id': msg_id,
+            'threadId': msg_id,
+            'labelIds': ['INBOX'],
+            'internalDate': '1760000000000',
+            'payload': {'headers': [
+                {'name': 'From', 'value': 'customer@example.com'},
+                {'name': 'Subject', 'value': f'Message {msg_id}'},
+                {'name': 'Date', 'value': 'Thu, 09 Oct 2025 10:00:00 +0000'}
+            ]}
+        }
+    
+    def do_GET(self):
+        url = urlparse(self.path)
+        match = GET_PATTERN.match(f'GET {url.path}')
+        if match:
+            self._count('get')
+            self._send(json.dumps(self.message(match.group(1))))
+            return
+        
+        self._count('list')
+        params = parse_qs(url.query)
+        start = int(params.get('pageToken', ['0'])[0])
+        end = min(start + int(params.get('maxResults', ['100'])[0]), self.message_count)
+        page = {'messages': [{'id': f'{i:08x}', 'threadId': f'{i:08x}'} for i in range(start, end)]}
+        if end < self.message_count:
+            page['nextPageToken'] = str(end)
+        self._send(json.dumps(page))
+    
+    def do_POST(self):
+        self._count('batch')
+        body = self.rfile.read(int(self.headers['Content-Length'])).decode()
+        content_type = self.headers['Content-Type']
+        boundary = content_type.split('boundary=')[1].strip('"')
+        
+        parts = []
+        for part in body.split(f'--{boundary}')[1:-1]:
+            content_id = re.search(r'Content-ID: <([^>]+)>', part).group(1)
+            msg_id = GET_PATTERN.search(part).group(1)
+            payload = json.dumps(self.message(msg_id))
+            parts.append(
+                f'--batch_response\r\nContent-Type: application/http\r\n'
+                f'Content-ID: <response-{content_id}>\r\n\r\n'
+                f'HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n'
+                f'Content-Length: {len(payload)}\r\n\r\n{payload}\r\n'
+            )
+        with self.lock:
+            self.counts['batched_calls'] = self.counts.get('batched_calls', 0) + len(parts)
+        self._send(''.join(parts) + '--batch_response--\r\n', 'multipart/mixed; boundary=batch_response')
+
+class LocalEmailCollector(EmailCollector):
+    """EmailCollector whose service points at the stand-in server instead of Gmail"""
+    root_url = None
+    
+    def authenticate(self):
+        """Build the Gmail service from the bundled discovery document"""
+        path = os.path.join(os.path.dirname(googleapiclient.__file__), 'discovery_cache', 'documents', 'gmail.v1.json')
+        with open(path) as f:
+            document = json.load(f)
+        document['rootUrl'] = self.root_url
+        self.service = build_from_document(document, http=httplib2.Http())
+
+def run(message_count, batch_size):
+    """Collect message_count messages and get the wall time and server call counts"""
+    GmailStandIn.message_count = message_count
+    GmailStandIn.counts = {}
+    scheduler = RequestScheduler('gmail', 1e9, burst=1e9)
+    collector = LocalEmailCollector(batch_size=batch_size, incremental=False,
+                                    fetch_format='metadata', scheduler=scheduler)
+    
+    start = time.perf_counter()
+    messages = collector.get_messages(datetime(2025, 10, 1), datetime(2025, 10, 15))
+    elapsed = time.perf_counter() - start
+    assert [msg['id'] for msg in messages] == [f'{i:08x}' for i in range(message_count)]
+    return elapsed, dict(GmailStandIn.counts)
+
+def main():
+    counts = [int(arg) for arg in sys.argv[1:]] or [1000, 10000]
+    server = ThreadingHTTPServer(('127.0.0.1', 0), GmailStandIn)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    LocalEmailCollector.root_url = f'http://127.0.0.1:{server.server_port}/'
+    
+    print(f'{"messages":>9} {"batch":>6} {"seconds":>8} {"http requests":>14} {"per message":>12}')
+    for message_count in counts:
+        # A batch of one is the old one-round-trip-per-message behaviour
+        for batch_size in (1, GMAIL_MAX_BATCH_SIZE):
+            elapsed, calls = run(message_count, batch_size)
+            requests = calls.get('list', 0) + calls.get('batch', 0) + calls.get('get', 0)
+            print(f'{message_count:>9} {batch_size:>6} {elapsed:>8.2f} {requests:>14} {requests / message_count:>12.3f}')
+    
+    server.shutdown()
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file
@@ -0,0 +1,77 @@
+"""Benchmark KeywordMatcher against per-keyword substring scans at several keyword densities
+
+Usage: python benchmarks/keyword_matching.py [document count]
+"""
+import os
+import random
+import sys
+import time
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from ai_analyzer import AIAnalyzer
+from email_features import extractor
+
+DENSITIES = (0.02, 0.05, 0.2, 0.5, 0.8)
+FILLER = (
+    'the', 'team', 'we', 'will', 'send', 'update', 'about', 'next', 'week', 'please', 'see', 'attached',
+    'thanks', 'for', 'your', 'time', 'regarding', 'project', 'notes', 'status', 'today', 'office', 'yesterday',
+    'morning', 'document', 'version', 'changes', 'sent', 'email', 'reply', 'confirm', 'monday', 'friday'
+)
+REPEATS = 5
+
+def build_documents(count, keywords, density):
+    """Build lowercased documents where roughly density of the words are keywords"""
+    rnd = random.Random(count)
+    return [
+        ' '.join(rnd.choice(keywords) if rnd.random() < density else rnd.choice(FILLER)
+                 for _ in range(rnd.randint(20, 400)))
+        for _ in range(count)
+    ]
+
+def scan_counts(groups, text):
+    """Count keyword hits per label the way the classifiers did before, one substring scan per keyword"""
+    counts = Counter()
+    for label, keywords in groups.items():
+        score = sum(1 for keyword in keywords if keyword in text)
+        if score:
+            counts[label] = score
+    return counts
+
+def best_rate(func, documents):
+    """Get the best documents-per-second rate of func over several runs"""
+    best = None
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        for text in documents:
+            func(text)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return len(documents) / best
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 3000
+    matchers = {
+        'analyzer': AIAnalyzer().matcher,
+        'email features': extractor.matcher
+    }
+    
+    print(f'{"matcher":>15} {"density":>8} {"scans/s":>10} {"matcher/s":>10} {"speedup":>8}')
+    for name, matcher in matchers.items():
+        groups = {}
+        for keyword, labels in matcher.labels.items():
+            for label in labels:
+                groups.setdefault(label, []).append(keyword)
+        keywords = sorted(matcher.labels)
+        
+        for density in DENSITIES:
+            documents = build_documents(count, keywords, density)
+            # Keyword hits must be identical to the substring scans
+            assert all(matcher.count(text) == scan_counts(groups, text) for text in documents)
+            
+            before = best_rate(lambda text: scan_counts(groups, text), documents)
+            after = best_rate(matcher.count, documents)
+            print(f'{name:>15} {density:>8.2f} {before:>10,.0f} {after:>10,.0f} {after / before:>7.2f}x')
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file
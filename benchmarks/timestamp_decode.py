@@ -0,0 +1,75 @@
+"""Micro-benchmark WhatsApp timestamp decoding: strptime fallback chain vs integer decoding
+
+Usage: python benchmarks/timestamp_decode.py [header count]
+"""
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from whatsapp_collector import MESSAGE_HEADER, WhatsAppCollector
+
+def build_headers(count, day_first):
+    """Build message header lines in DD/MM or MM/DD order"""
+    rnd = random.Random(count)
+    moment = datetime(2025, 1, 1)
+    date_format = '%d/%m/%Y' if day_first else '%m/%d/%Y'
+    lines = []
+    for _ in range(count):
+        moment += timedelta(seconds=rnd.randrange(1, 3600))
+        lines.append(f'[{moment.strftime(date_format)}, {moment:%H:%M:%S}] +52 55 1234 5678: hola')
+    return lines
+
+def decode_strptime(groups):
+    """Decode the way exports used to be parsed: build a string and try both date orders"""
+    first, other, year, hour, minute, second = groups[:6]
+    datetime_str = f'{first}/{other}/{year} {hour}:{minute}:{second}'
+    try:
+        return datetime.strptime(datetime_str, '%d/%m/%Y %H:%M:%S')
+    except ValueError:
+        try:
+            return datetime.strptime(datetime_str, '%m/%d/%Y %H:%M:%S')
+        except ValueError:
+            return None
+
+def decode_integers(groups, day_first):
+    """Decode from the regex groups by integer conversion, in the order detected for the file"""
+    first, other, year, hour, minute, second = groups[:6]
+    day, month = (first, other) if day_first else (other, first)
+    try:
+        return datetime(int(year), int(month), int(day), int(hour), int(minute), int(second))
+    except ValueError:
+        return datetime(int(year), int(day), int(month), int(hour), int(minute), int(second))
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    collector = WhatsAppCollector()
+    
+    print(f'{"order":>6} {"strptime":>9} {"integers":>9} {"parser":>9} {"speedup":>8}')
+    for day_first in (True, False):
+        groups = [MESSAGE_HEADER.match(line).groups() for line in build_headers(count, day_first)]
+        
+        start = time.perf_counter()
+        expected = [decode_strptime(g) for g in groups]
+        strptime_time = time.perf_counter() - start
+        
+        start = time.perf_counter()
+        decoded = [decode_integers(g, day_first) for g in groups]
+        integer_time = time.perf_counter() - start
+        
+        # The parser's own message builder, including sender classification
+        start = time.perf_counter()
+        built = [collector._build_message(g, day_first) for g in groups]
+        parser_time = time.perf_counter() - start
+        
+        # strptime tries DD/MM first, so only day-first exports decode identically
+        if day_first:
+            assert decoded == expected
+        assert [message['datetime'] for message in built] == decoded
+        print(f'{"DD/MM" if day_first else "MM/DD":>6} {strptime_time:>8.2f}s {integer_time:>8.2f}s '
+              f'{parser_time:>8.2f}s {strptime_time / integer_time:>7.1f}x')
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file
@@ -0,0 +1,67 @@
+"""Benchmark the NumPy response-time and SLA metrics on 10M WhatsApp messages
+
+Usage: python benchmarks/whatsapp_metrics.py [message count] [messages per conversation]
+"""
+import os
+import sys
+import time
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import Config
+from whatsapp_metrics import reply_waits, response_metrics
+
+# A per-message Python loop is only timed on this many messages
+PYTHON_SAMPLE = 1000000
+
+def build_arrays(message_count, conversation_length):
+    """Build conversation-ordered ids, epoch seconds and customer flags for synthetic conversations"""
+    rng = np.random.default_rng(message_count)
+    conv_ids = np.arange(message_count, dtype=np.int64) // conversation_length
+    seconds = 1760000000 + np.cumsum(rng.integers(5, 3600, message_count))
+    is_customer = rng.random(message_count) < 0.6
+    return conv_ids, seconds, is_customer
+
+def python_reply_waits(conv_ids, seconds, is_customer):
+    """Reply waits computed one message at a time, for comparison"""
+    waits = []
+    turn_start = None
+    previous_conv = None
+    for conv_id, second, customer in zip(conv_ids.tolist(), seconds.tolist(), is_customer.tolist()):
+        if conv_id != previous_conv:
+            turn_start = None
+            previous_conv = conv_id
+        if customer:
+            if turn_start is None:
+                turn_start = second
+        elif turn_start is not None:
+            waits.append(second - turn_start)
+            turn_start = None
+    return waits
+
+def main():
+    message_count = int(sys.argv[1]) if len(sys.argv) > 1 else 10000000
+    conversation_length = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    conv_ids, seconds, is_customer = build_arrays(message_count, conversation_length)
+    conversation_count = int(conv_ids[-1]) + 1
+    
+    start = time.perf_counter()
+    metrics = response_metrics(conv_ids, seconds, is_customer, conversation_count, Config.WHATSAPP_SLA_MINUTES)
+    elapsed = time.perf_counter() - start
+    print(f'NumPy: {message_count} messages, {metrics["total_responses"]} replies in {elapsed:.2f}s '
+          f'({message_count / elapsed:,.0f} messages/s)')
+    percentiles = ', '.join(f'{name} {value:.1f}' for name, value in metrics['percentiles'].items())
+    print(f'  average {metrics["average_response_time"]:.1f} min, {percentiles}, '
+          f'{metrics["sla_breaches"]} SLA breaches')
+    
+    sample = min(message_count, PYTHON_SAMPLE)
+    # Cut at a conversation boundary so both sides see the same replies
+    sample -= sample % conversation_length
+    start = time.perf_counter()
+    waits = python_reply_waits(conv_ids[:sample], seconds[:sample], is_customer[:sample])
+    elapsed = time.perf_counter() - start
+    assert waits == reply_waits(conv_ids[:sample], seconds[:sample], is_customer[:sample])[1].tolist()
+    print(f'Python loop: {sample} messages in {elapsed:.2f}s ({sample / elapsed:,.0f} messages/s)')
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file
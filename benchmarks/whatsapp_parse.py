@@ -0,0 +1,64 @@
+"""Benchmark parallel WhatsApp export parsing from 1 to N worker processes
+
+Usage: python benchmarks/whatsapp_parse.py [export count] [messages per export] [export dir]
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import Config
+from whatsapp_collector import WhatsAppCollector
+
+WORDS = ['hola', 'ayuda', 'factura', 'pago', 'error', 'pedido', 'gracias', 'envio', 'precio', 'problema']
+
+def write_exports(path, export_count, messages_per_export):
+    """Write synthetic per-customer chat exports with agent replies and multi-line messages"""
+    os.makedirs(path, exist_ok=True)
+    rnd = random.Random(export_count)
+    for export in range(export_count):
+        customer = f'+52 55 {export:04d} {rnd.randrange(10000):04d}'
+        moment = datetime(2026, 1, 1) + timedelta(minutes=rnd.randrange(1440))
+        lines = []
+        for i in range(messages_per_export):
+            moment += timedelta(seconds=rnd.randrange(30, 3600))
+            sender = customer if i % 2 == 0 else 'Soporte'
+            text = ' '.join(rnd.choices(WORDS, k=rnd.randrange(2, 12)))
+            lines.append(f'[{moment:%d/%m/%Y}, {moment:%H:%M:%S}] {sender}: {text}')
+            if i % 25 == 0:
+                lines.append(' '.join(rnd.choices(WORDS, k=5)))
+        with open(os.path.join(path, f'chat_{export:04d}.txt'), 'w', encoding='utf-8') as f:
+            f.write('\n'.join(lines) + '\n')
+
+def main():
+    export_count = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    messages_per_export = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+    path = sys.argv[3] if len(sys.argv) > 3 else os.path.join(
+        tempfile.gettempdir(), f'whatsapp_exports_{export_count}x{messages_per_export}')
+    
+    if not os.path.exists(path):
+        write_exports(path, export_count, messages_per_export)
+        print(f'Wrote {export_count} exports of {messages_per_export} messages to {path}')
+    
+    # Every run has to parse, not read the previous run's cache
+    Config.WHATSAPP_CACHE_DIR = None
+    
+    cpus = os.cpu_count() or 1
+    workers = sorted({1, cpus} | {2 ** n for n in range(cpus.bit_length()) if 2 ** n <= cpus})
+    baseline = None
+    print(f'{"workers":>7} {"messages":>10} {"seconds":>8} {"speedup":>8}')
+    for worker_count in workers:
+        Config.WHATSAPP_MAX_WORKERS = worker_count
+        collector = WhatsAppCollector(path)
+        
+        start = time.perf_counter()
+        messages = len(collector.get_store())
+        elapsed = time.perf_counter() - start
+        baseline = baseline or elapsed
+        print(f'{worker_count:>7} {messages:>10} {elapsed:>8.2f} {baseline / elapsed:>7.2f}x')
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file
@@ -0,0 +1,49 @@
+"""Benchmark conversation segmentation on 1M interleaved WhatsApp messages
+
+Usage: python benchmarks/whatsapp_segment.py [message count] [chat count]
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from whatsapp_collector import CONVERSATION_GAP_SECONDS
+from whatsapp_store import MessageStore
+
+def build_store(message_count, chat_count):
+    """Build a store of chats whose messages interleave in time, a third of them agent replies"""
+    rnd = random.Random(message_count)
+    results = [([], [], [], bytearray()) for _ in range(chat_count)]
+    moment = 1760000000
+    for i in range(message_count):
+        # Mostly seconds apart, with occasional silences long enough to end a conversation
+        moment += rnd.randrange(1, 10) if rnd.random() > 0.001 else CONVERSATION_GAP_SECONDS
+        chat = rnd.randrange(chat_count)
+        seconds, senders, texts, flags = results[chat]
+        is_customer = rnd.random() > 0.33
+        seconds.append(moment)
+        senders.append(f'+52 55 {chat:06d}' if is_customer else 'Soporte')
+        texts.append('mensaje')
+        flags.append(is_customer)
+    return MessageStore(results, [f'chat_{chat}' for chat in range(chat_count)])
+
+def main():
+    message_count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    chat_count = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    
+    start = time.perf_counter()
+    store = build_store(message_count, chat_count)
+    print(f'Built a store of {len(store)} messages in {chat_count} chats in {time.perf_counter() - start:.2f}s')
+    
+    messages = store.select()
+    start = time.perf_counter()
+    conversations = messages.conversations(CONVERSATION_GAP_SECONDS)
+    elapsed = time.perf_counter() - start
+    
+    grouped = conversations.bounds[-1]
+    print(f'{len(conversations)} conversations holding {grouped} messages in {elapsed:.2f}s '
+          f'({message_count / elapsed:,.0f} messages/s)')
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file
@@ -9,13 +9,49 @@ class Config:
     GMAIL_CREDENTIALS_FILE = os.getenv('GMAIL_CREDENTIALS_FILE', 'credentials.json')
     GMAIL_TOKEN_FILE = os.getenv('GMAIL_TOKEN_FILE', 'token.json')
     GMAIL_SCOPES = ['https://www.googleapis.com/auth/gmail.readonly']
+    GMAIL_TOKEN_DIR = os.getenv('GMAIL_TOKEN_DIR', 'tokens')
+    GMAIL_REQUESTS_PER_SECOND = float(os.getenv('GMAIL_REQUESTS_PER_SECOND', '40'))
+    GMAIL_PAGE_SIZE = int(os.getenv('GMAIL_PAGE_SIZE', '500'))
+    GMAIL_BATCH_SIZE = int(os.getenv('GMAIL_BATCH_SIZE', '50'))
+    GMAIL_BATCH_CONCURRENCY = int(os.getenv('GMAIL_BATCH_CONCURRENCY', '4'))
+    GMAIL_BODY_MAX_BYTES = int(os.getenv('GMAIL_BODY_MAX_BYTES', '0'))
+    GMAIL_INCREMENTAL_SYNC = os.getenv('GMAIL_INCREMENTAL_SYNC', 'false').lower() in ('1', 'true', 'yes')
+    GMAIL_STORE_PATH = os.getenv('GMAIL_STORE_PATH', 'email_store.db')
+    
+    # Offline mailbox archive (mbox file or folder of .mbox/.eml files) used instead of Gmail
+    EMAIL_ARCHIVE_PATH = os.getenv('EMAIL_ARCHIVE_PATH')
+    
+    # Download message bodies for AI/keyword analysis (headers only when disabled)
+    EMAIL_BODY_ANALYSIS = os.getenv('EMAIL_BODY_ANALYSIS', 'true').lower() in ('1', 'true', 'yes')
     
     # GitHub settings
     GITHUB_TOKEN = os.getenv('GITHUB_TOKEN')
     GITHUB_USERNAME = os.getenv('GITHUB_USERNAME')
+    GITHUB_REQUESTS_PER_SECOND = float(os.getenv('GITHUB_REQUESTS_PER_SECOND', '10'))
+    GITHUB_USE_GRAPHQL = os.getenv('GITHUB_USE_GRAPHQL', 'true').lower() in ('1', 'true', 'yes')
+    GITHUB_MAX_WORKERS = int(os.getenv('GITHUB_MAX_WORKERS', '4'))
+    GITHUB_HTTP_CACHE = os.getenv('GITHUB_HTTP_CACHE', 'github_cache.db')
+    GITHUB_HTTP_CACHE_MAX_MB = float(os.getenv('GITHUB_HTTP_CACHE_MAX_MB', '100'))
+    GITHUB_INCREMENTAL_SYNC = os.getenv('GITHUB_INCREMENTAL_SYNC', 'false').lower() in ('1', 'true', 'yes')
+    GITHUB_STORE_PATH = os.getenv('GITHUB_STORE_PATH', 'github_store.db')
+    GITHUB_REVALIDATE_DAYS = int(os.getenv('GITHUB_REVALIDATE_DAYS', '7'))
+    GIT_LOCAL_REPOS = [path.strip() for path in os.getenv('GIT_LOCAL_REPOS', '').split(',') if path.strip()]
+    GIT_AUTHOR_EMAILS = [email.strip() for email in os.getenv('GIT_AUTHOR_EMAILS', '').split(',') if email.strip()]
+    
+    # Retries for rate-limited or failed API requests (Gmail and GitHub)
+    API_MAX_RETRIES = int(os.getenv('API_MAX_RETRIES', '5'))
     
     # WhatsApp settings
     WHATSAPP_DATA_PATH = os.getenv('WHATSAPP_DATA_PATH')
+    # Processes parsing export files in parallel (0 = one per CPU)
+    WHATSAPP_MAX_WORKERS = int(os.getenv('WHATSAPP_MAX_WORKERS', '0'))
+    # Parsed exports are cached here and reused while a file's size and mtime are unchanged
+    WHATSAPP_CACHE_DIR = os.getenv('WHATSAPP_CACHE_DIR', 'whatsapp_cache')
+    WHATSAPP_CACHE_HASH = os.getenv('WHATSAPP_CACHE_HASH', 'false').lower() in ('1', 'true', 'yes')
+    # Grown exports whose previous content is unchanged only have their new tail parsed
+    WHATSAPP_INCREMENTAL = os.getenv('WHATSAPP_INCREMENTAL', 'false').lower() in ('1', 'true', 'yes')
+    # Customer turns waiting longer than this for a reply count as SLA breaches
+    WHATSAPP_SLA_MINUTES = int(os.getenv('WHATSAPP_SLA_MINUTES', '60'))
     
     # Report settings
     REPORT_TEMPLATE_PATH = os.getenv('REPORT_TEMPLATE_PATH', 
@@ -24,7 +60,8 @@ class Config:
         r'O:\OneDrive\Documentos\-- TurboAir\-- Reportes de Actividad')
     
     # Email accounts
-    EMAIL_ACCOUNTS = os.getenv('EMAIL_ACCOUNTS', '').split(',')
+    EMAIL_ACCOUNTS = [account.strip() for account in os.getenv('EMAIL_ACCOUNTS', '').split(',') if account.strip()]
+    EMAIL_MAX_WORKERS = int(os.getenv('EMAIL_MAX_WORKERS', '4'))
     
     @staticmethod
     def get_report_period(start_date=None, end_date=None):
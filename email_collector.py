@@ -1,24 +1,81 @@
 import os
 import pickle
 import base64
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta
+import httplib2
 from google.auth.transport.requests import Request
 from google.oauth2.credentials import Credentials
+from google_auth_httplib2 import AuthorizedHttp
 from google_auth_oauthlib.flow import InstalledAppFlow
 from googleapiclient.discovery import build
+from googleapiclient.errors import HttpError
 from config import Config
+from email_store import EmailStore
+from email_features import extract_features
+from request_scheduler import RequestScheduler
+
+# Gmail rejects batch requests with more than 100 calls
+GMAIL_MAX_BATCH_SIZE = 100
+# messages().list() returns at most 500 ids per page
+GMAIL_MAX_PAGE_SIZE = 500
+
+# Everything the reports use, synced with one listing query
+SYNC_QUERY = '{in:sent in:inbox}'
+SYNC_LABELS = {'in:sent': 'SENT', 'in:inbox': 'INBOX'}
+HISTORY_TYPES = ['messageAdded', 'messageDeleted', 'labelAdded', 'labelRemoved']
+
+# Headers requested for metadata-only fetches
+METADATA_HEADERS = ['From', 'To', 'Subject', 'Date', 'Message-ID']
 
 class EmailCollector:
-    def __init__(self):
+    def __init__(self, batch_size=None, batch_concurrency=None, page_size=None,
+                 incremental=None, store_path=None, fetch_format=None, body_max_bytes=None,
+                 account=None, scheduler=None):
         self.service = None
+        self.credentials = None
+        self.account = account
+        self.user_id = account or 'me'
+        self.scheduler = scheduler or RequestScheduler(
+            'gmail', Config.GMAIL_REQUESTS_PER_SECOND, burst=Config.GMAIL_BATCH_SIZE)
+        
+        # Each configured account keeps its own token and client secrets
+        if account:
+            self.token_file = os.path.join(Config.GMAIL_TOKEN_DIR, f'token_{account}.json')
+            account_credentials = os.path.join(Config.GMAIL_TOKEN_DIR, f'credentials_{account}.json')
+            self.credentials_file = account_credentials if os.path.exists(account_credentials) else Config.GMAIL_CREDENTIALS_FILE
+        else:
+            self.token_file = Config.GMAIL_TOKEN_FILE
+            self.credentials_file = Config.GMAIL_CREDENTIALS_FILE
+        
+        # Bodies are only downloaded when body-based analysis needs them
+        if fetch_format is None:
+            fetch_format = 'full' if Config.EMAIL_BODY_ANALYSIS else 'metadata'
+        self.fetch_format = fetch_format
+        self.body_max_bytes = Config.GMAIL_BODY_MAX_BYTES if body_max_bytes is None else body_max_bytes
+        self.page_size = max(1, min(page_size or Config.GMAIL_PAGE_SIZE, GMAIL_MAX_PAGE_SIZE))
+        self.batch_size = max(1, min(batch_size or Config.GMAIL_BATCH_SIZE, GMAIL_MAX_BATCH_SIZE))
+        self.batch_concurrency = max(1, batch_concurrency or Config.GMAIL_BATCH_CONCURRENCY)
+        self._local = threading.local()
+        
+        if incremental is None:
+            incremental = Config.GMAIL_INCREMENTAL_SYNC
+        if incremental and not store_path:
+            store_path = Config.GMAIL_STORE_PATH
+            if account:
+                base, ext = os.path.splitext(store_path)
+                store_path = f'{base}_{account}{ext}'
+        self.store = EmailStore(store_path) if incremental else None
+        
         self.authenticate()
     
     def authenticate(self):
         """Authenticate with Gmail API"""
         creds = None
         
-        if os.path.exists(Config.GMAIL_TOKEN_FILE):
-            with open(Config.GMAIL_TOKEN_FILE, 'rb') as token:
+        if os.path.exists(self.token_file):
+            with open(self.token_file, 'rb') as token:
                 creds = pickle.load(token)
         
         if not creds or not creds.valid:
@@ -26,47 +83,258 @@ class EmailCollector:
                 creds.refresh(Request())
             else:
                 flow = InstalledAppFlow.from_client_secrets_file(
-                    Config.GMAIL_CREDENTIALS_FILE, Config.GMAIL_SCOPES)
+                    self.credentials_file, Config.GMAIL_SCOPES)
                 creds = flow.run_local_server(port=0)
             
-            with open(Config.GMAIL_TOKEN_FILE, 'wb') as token:
+            token_dir = os.path.dirname(self.token_file)
+            if token_dir:
+                os.makedirs(token_dir, exist_ok=True)
+            with open(self.token_file, 'wb') as token:
                 pickle.dump(creds, token)
         
+        self.credentials = creds
         self.service = build('gmail', 'v1', credentials=creds)
     
-    def get_messages(self, start_date, end_date, query=''):
+    def _build_query(self, start_date, end_date, query=''):
+        """Build a Gmail search query for a date range"""
+        # Epoch seconds, since Gmail reads after:/before: dates as midnight Pacific time
+        # while the store keeps local-time periods; both must select the same messages
+        after, before = self._period_bounds(start_date, end_date)
+        
+        # Build query
+        full_query = f'after:{after} before:{before}'
+        if query:
+            full_query += f' {query}'
+        return full_query
+    
+    def _iter_message_ids(self, full_query, max_results=None):
+        """Yield pages of message ids matching a query, following nextPageToken"""
+        page_token = None
+        while True:
+            results = self._execute(self.service.users().messages().list(
+                userId=self.user_id,
+                q=full_query,
+                maxResults=max_results or self.page_size,
+                pageToken=page_token
+            ))
+            
+            yield [msg['id'] for msg in results.get('messages', [])]
+            
+            page_token = results.get('nextPageToken')
+            if not page_token:
+                break
+    
+    def iter_messages(self, start_date, end_date, query='', max_results=None):
+        """Yield parsed messages within date range, following every result page"""
+        full_query = self._build_query(start_date, end_date, query)
+        
+        # Fetch each page before listing the next so callers can start early
+        for message_ids in self._iter_message_ids(full_query, max_results):
+            for message in self.fetch_messages(message_ids):
+                yield message
+    
+    def get_messages(self, start_date, end_date, query='', max_results=None):
         """Get messages within date range"""
+        # Errors left after the scheduler's retries propagate, so a failed run is never an empty report
+        if self.store is not None and query in SYNC_LABELS:
+            # Serve from the local store after pulling only what changed
+            self.sync(start_date, end_date)
+            start, end = self._period_bounds(start_date, end_date)
+            return self.store.get_messages(start, end, label=SYNC_LABELS[query])
+        
+        return list(self.iter_messages(start_date, end_date, query, max_results))
+    
+    def sync(self, start_date, end_date):
+        """Bring the local store up to date for a period"""
+        # Messages stored without bodies have to be fetched again for body analysis
+        if self.fetch_format != 'metadata' and self.store.get_meta('fetch_format') == 'metadata':
+            self.store.clear()
+        self.store.set_meta('fetch_format', self.fetch_format)
+        
+        history_id = self.store.get_meta('history_id')
+        if history_id:
+            history_id = self._apply_history(history_id)
+        
+        if not history_id:
+            # First sync or expired history: record where to resume from
+            # before listing so changes made during the listing are not lost
+            self.store.clear_synced_ranges()
+            history_id = self._execute(self.service.users().getProfile(userId=self.user_id))['historyId']
+        
+        start, end = self._period_bounds(start_date, end_date)
+        if not self.store.is_synced(start, end):
+            self._sync_period(start_date, end_date)
+            self.store.add_synced_range(start, end)
+        
+        self.store.set_meta('history_id', history_id)
+    
+    def _sync_period(self, start_date, end_date):
+        """List a period and fetch only the messages missing from the store"""
+        start, end = self._period_bounds(start_date, end_date)
+        stored_ids = self.store.get_message_ids(start, end)
+        listed_ids = set()
+        
+        full_query = self._build_query(start_date, end_date, SYNC_QUERY)
+        for message_ids in self._iter_message_ids(full_query):
+            listed_ids.update(message_ids)
+            missing = [msg_id for msg_id in message_ids if msg_id not in stored_ids]
+            self.store.save_messages(self.fetch_messages(missing))
+        
+        # Messages deleted while no history was being tracked
+        self.store.delete_messages(stored_ids - listed_ids)
+    
+    def _apply_history(self, history_id):
+        """Apply mailbox changes since history_id, returning the new history id"""
+        added = set()
+        deleted = set()
+        labels = {}
+        page_token = None
+        
         try:
-            # Format dates for Gmail query
-            after = start_date.strftime('%Y/%m/%d')
-            before = (end_date + timedelta(days=1)).strftime('%Y/%m/%d')
-            
-            # Build query
-            full_query = f'after:{after} before:{before}'
-            if query:
-                full_query += f' {query}'
+            while True:
+                results = self._execute(self.service.users().history().list(
+                    userId=self.user_id,
+                    startHistoryId=history_id,
+                    historyTypes=HISTORY_TYPES,
+                    pageToken=page_token
+                ))
+                
+                for record in results.get('history', []):
+                    for change in record.get('messagesAdded', []):
+                        message = change['message']
+                        added.add(message['id'])
+                        deleted.discard(message['id'])
+                        labels[message['id']] = message.get('labelIds', [])
+                    for change in record.get('messagesDeleted', []):
+                        message = change['message']
+                        deleted.add(message['id'])
+                        added.discard(message['id'])
+                        labels.pop(message['id'], None)
+                    for change in record.get('labelsAdded', []) + record.get('labelsRemoved', []):
+                        message = change['message']
+                        labels[message['id']] = message.get('labelIds', [])
+                
+                page_token = results.get('nextPageToken')
+                if not page_token:
+                    new_history_id = results.get('historyId', history_id)
+                    break
+        except HttpError as e:
+            # History ids expire after about a week; fall back to a full listing
+            if getattr(e.resp, 'status', None) == 404:
+                return None
+            raise
+        
+        self.store.delete_messages(deleted)
+        self.store.update_labels(labels)
+        
+        # Fetch new messages and ones moved into the synced labels, skipping drafts, spam and
+        # chats by the labels the history records already carry
+        wanted = set(SYNC_LABELS.values())
+        fetch_ids = [
+            msg_id for msg_id, label_ids in labels.items()
+            if wanted.intersection(label_ids) and (msg_id in added or not self.store.has_message(msg_id))
+        ]
+        self.store.save_messages(self.fetch_messages(fetch_ids))
+        
+        return new_history_id
+    
+    @staticmethod
+    def _period_bounds(start_date, end_date):
+        """Get a period as local-time epoch seconds, as used by the store and the after:/before: query"""
+        start = datetime(start_date.year, start_date.month, start_date.day)
+        end = datetime(end_date.year, end_date.month, end_date.day) + timedelta(days=1)
+        return int(start.timestamp()), int(end.timestamp())
+    
+    def fetch_messages(self, message_ids):
+        """Fetch and parse messages using Gmail batch requests, preserving order"""
+        chunks = [
+            message_ids[i:i + self.batch_size]
+            for i in range(0, len(message_ids), self.batch_size)
+        ]
+        
+        # Each worker thread needs its own HTTP transport, so concurrency
+        # requires the credentials the service was built with
+        if self.batch_concurrency > 1 and len(chunks) > 1 and self.credentials:
+            with ThreadPoolExecutor(max_workers=self.batch_concurrency) as executor:
+                results = list(executor.map(self._fetch_batch, chunks))
+        else:
+            results = [self._fetch_batch(chunk) for chunk in chunks]
+        
+        return [msg for chunk in results for msg in chunk]
+    
+    def _fetch_batch(self, message_ids):
+        """Fetch one chunk of messages with a single batch request"""
+        responses = {}
+        pending = list(message_ids)
+        errors = []
+        
+        attempts = self.scheduler.max_retries + 1
+        for attempt in range(attempts):
+            retry = []
             
-            results = self.service.users().messages().list(
-                userId='me',
-                q=full_query
-            ).execute()
+            def callback(request_id, response, exception):
+                if exception is None:
+                    responses[request_id] = response
+                elif self.scheduler.retry_delay(exception, attempt) is not None:
+                    retry.append(request_id)
+                    errors.append(exception)
+                else:
+                    print(f'Error fetching message {request_id}: {exception}')
             
-            messages = results.get('messages', [])
+            def send():
+                batch = self.service.new_batch_http_request(callback=callback)
+                for msg_id in pending:
+                    batch.add(self._get_request(msg_id), request_id=msg_id)
+                batch.execute(http=self._get_http())
             
-            # Get full message details
-            detailed_messages = []
-            for msg in messages:
-                msg_data = self.service.users().messages().get(
-                    userId='me',
-                    id=msg['id']
-                ).execute()
-                detailed_messages.append(self.parse_message(msg_data))
+            # Every call inside a batch counts against the per-user quota
+            self.scheduler.call(send, cost=len(pending))
             
-            return detailed_messages
+            if not retry:
+                break
             
-        except Exception as e:
-            print(f'An error occurred: {e}')
-            return []
+            # Back off before resending the calls that were rate limited
+            pending = retry
+            self.scheduler.count('retries', len(retry))
+            self.scheduler.sleep(self.scheduler.backoff(attempt))
+        else:
+            # Dropping the messages would silently shrink the report
+            self.scheduler.count('failures')
+            print(f'Giving up on {len(pending)} messages after {attempts} attempts')
+            raise errors[-1]
+        
+        return [self.parse_message(responses[msg_id]) for msg_id in message_ids if msg_id in responses]
+    
+    def _execute(self, request):
+        """Execute a single API request through the scheduler"""
+        return self.scheduler.call(request.execute)
+    
+    def get_request_stats(self):
+        """Get request, retry and throttling counters for this account"""
+        return self.scheduler.get_stats()
+    
+    def _get_request(self, message_id):
+        """Build a messages().get() request for the configured fetch format"""
+        if self.fetch_format == 'metadata':
+            return self.service.users().messages().get(
+                userId=self.user_id,
+                id=message_id,
+                format='metadata',
+                metadataHeaders=METADATA_HEADERS
+            )
+        return self.service.users().messages().get(userId=self.user_id, id=message_id, format=self.fetch_format)
+    
+    def _get_http(self):
+        """Get an authorized HTTP transport for the current thread"""
+        if not self.credentials:
+            return None
+        
+        # httplib2 connections are not thread-safe
+        http = getattr(self._local, 'http', None)
+        if http is None:
+            http = AuthorizedHttp(self.credentials, http=httplib2.Http())
+            self._local.http = http
+        return http
     
     def parse_message(self, message):
         """Parse email message"""
@@ -76,16 +344,20 @@ class EmailCollector:
         # Extract headers
         msg_info = {
             'id': message['id'],
-            'threadId': message['threadId']
+            'threadId': message['threadId'],
+            'labelIds': message.get('labelIds', []),
+            'internalDate': int(message.get('internalDate', 0))
         }
         
         for header in headers:
-            name = header['name']
-            if name in ['From', 'To', 'Subject', 'Date']:
-                msg_info[name.lower()] = header['value']
+            name = header['name'].lower()
+            if name in ['from', 'to', 'subject', 'date']:
+                msg_info[name] = header['value']
+            elif name == 'message-id':
+                msg_info['message_id'] = header['value']
         
         # Extract body
-        msg_info['body'] = self.get_message_body(payload)
+        msg_info['body'] = self.get_message_body(payload) if self.fetch_format != 'metadata' else ''
         
         # Parse date
         if 'date' in msg_info:
@@ -103,16 +375,32 @@ class EmailCollector:
         body = ''
         
         if 'parts' in payload:
+            size = 0
             for part in payload['parts']:
-                if part['mimeType'] == 'text/plain':
-                    data = part['body']['data']
-                    body += base64.urlsafe_b64decode(data).decode('utf-8')
-        elif payload['body'].get('data'):
-            body = base64.urlsafe_b64decode(
-                payload['body']['data']).decode('utf-8')
+                if part['mimeType'] == 'text/plain' and part['body'].get('data'):
+                    text = self._decode_body(part['body']['data'], size)
+                    body += text
+                    
+                    # Stop decoding parts once the body size cap is reached
+                    if self.body_max_bytes:
+                        size += len(text.encode('utf-8'))
+                        if size >= self.body_max_bytes:
+                            break
+        elif payload.get('body', {}).get('data'):
+            body = self._decode_body(payload['body']['data'])
         
         return body
     
+    def _decode_body(self, data, decoded_bytes=0):
+        """Decode base64url body data, only decoding up to the body size cap"""
+        if not self.body_max_bytes:
+            return base64.urlsafe_b64decode(data).decode('utf-8')
+        
+        # Every 4 base64 characters hold 3 bytes
+        remaining = max(self.body_max_bytes - decoded_bytes, 0)
+        data = data[:(remaining + 2) // 3 * 4]
+        return base64.urlsafe_b64decode(data)[:remaining].decode('utf-8', errors='ignore')
+    
     def get_sent_emails(self, start_date, end_date):
         """Get sent emails within date range"""
         return self.get_messages(start_date, end_date, 'in:sent')
@@ -121,7 +409,49 @@ class EmailCollector:
         """Get received emails within date range"""
         return self.get_messages(start_date, end_date, 'in:inbox')
     
-    def categorize_emails(self, emails):
+    def collect(self, start_date, end_date):
+        """Collect sent and received emails for a period with a single listing"""
+        # Errors left after the scheduler's retries propagate, so a failed run is never an empty report
+        if self.store is not None:
+            self.sync(start_date, end_date)
+            start, end = self._period_bounds(start_date, end_date)
+            messages = self.store.get_messages(start, end)
+        else:
+            messages = self.iter_messages(start_date, end_date, SYNC_QUERY)
+        return self.group_messages(messages)
+    
+    @staticmethod
+    def group_messages(messages, key=None):
+        """Build the shared message table and split it into sent/received by label"""
+        table = {}
+        sent_emails = []
+        received_emails = []
+        
+        for msg in messages:
+            msg_key = key(msg) if key else msg['id']
+            if msg_key in table:
+                continue
+            
+            # Self-sent messages carry both labels and are counted once, as sent
+            label_ids = msg.get('labelIds', [])
+            if 'SENT' in label_ids:
+                sent_emails.append(msg)
+            elif 'INBOX' in label_ids:
+                received_emails.append(msg)
+            else:
+                continue
+            table[msg_key] = msg
+        
+        # Every list references the same message dicts as the table
+        return {
+            'messages': table,
+            'sent': sent_emails,
+            'received': received_emails,
+            'categorized': EmailCollector.categorize_emails(table.values())
+        }
+    
+    @staticmethod
+    def categorize_emails(emails):
         """Categorize emails by type/project"""
         categories = {
             'customer_support': [],
@@ -132,18 +462,74 @@ class EmailCollector:
         }
         
         for email in emails:
-            subject = email.get('subject', '').lower()
-            body = email.get('body', '').lower()
-            
-            if any(word in subject + body for word in ['ticket', 'soporte', 'support', 'problema', 'issue']):
-                categories['customer_support'].append(email)
-            elif any(word in subject + body for word in ['code', 'github', 'deploy', 'development', 'bug', 'feature']):
-                categories['development'].append(email)
-            elif any(word in subject + body for word in ['meeting', 'reunion', 'call', 'zoom', 'teams']):
-                categories['meetings'].append(email)
-            elif any(word in subject + body for word in ['reporte', 'report', 'informe']):
-                categories['reports'].append(email)
-            else:
-                categories['other'].append(email)
+            categories[extract_features(email).collector_category].append(email)
+        
+        return categories
+
+class MultiAccountEmailCollector:
+    """Collect email from every account in Config.EMAIL_ACCOUNTS concurrently"""
+    
+    def __init__(self, accounts=None, max_workers=None):
+        self.accounts = accounts or Config.EMAIL_ACCOUNTS
+        self.max_workers = max_workers or Config.EMAIL_MAX_WORKERS
+        self.collectors = {}
         
-        return categories
\ No newline at end of file
+        # Authentication may open a browser, so accounts are set up one at a time
+        for account in self.accounts:
+            try:
+                self.collectors[account] = EmailCollector(
+                    account=account,
+                    scheduler=RequestScheduler(
+                        f'gmail:{account}', Config.GMAIL_REQUESTS_PER_SECOND, burst=Config.GMAIL_BATCH_SIZE)
+                )
+            except Exception as e:
+                print(f'Error initializing email account {account}: {e}')
+    
+    def collect(self, start_date, end_date):
+        """Collect all accounts and merge them, deduplicated by Message-ID"""
+        results = {}
+        
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = {
+                executor.submit(self._collect_account, collector, start_date, end_date): account
+                for account, collector in self.collectors.items()
+            }
+            failed_accounts = []
+            for future in as_completed(futures):
+                account = futures[future]
+                try:
+                    results[account] = future.result()
+                except Exception as e:
+                    print(f'Error collecting email for {account}: {e}')
+                    failed_accounts.append(account)
+        
+        # Merge in configuration order so output does not depend on timing;
+        # a message sent between two accounts is kept as sent
+        merged = [
+            email
+            for key in ('sent', 'received')
+            for account in self.accounts
+            for email in results.get(account, {}).get(key, [])
+        ]
+        email_data = EmailCollector.group_messages(
+            merged,
+            key=lambda email: email.get('message_id') or f"{email['account']}:{email['id']}"
+        )
+        # Reported by main.py so a partial merge is not mistaken for a quiet period
+        email_data['failed_accounts'] = [account for account in self.accounts if account in failed_accounts]
+        return email_data
+    
+    def get_request_stats(self):
+        """Get request counters summed over every account"""
+        totals = {}
+        for collector in self.collectors.values():
+            for key, value in collector.get_request_stats().items():
+                totals[key] = totals.get(key, 0) + value
+        return totals
+    
+    def _collect_account(self, collector, start_date, end_date):
+        """Collect one account, tagging each email with it"""
+        email_data = collector.collect(start_date, end_date)
+        for email in email_data['messages'].values():
+            email['account'] = collector.account
+        return email_data
\ No newline at end of file
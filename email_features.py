@@ -0,0 +1,76 @@
+from collections import namedtuple
+from keyword_matcher import KeywordMatcher
+
+# Content categories scored by keyword count; every category with a hit is also a topic
+CATEGORY_KEYWORDS = {
+    'productivity': ['completed', 'finished', 'delivered', 'implemented', 'fixed', 'resolved', 'deployed'],
+    'communication': ['meeting', 'call', 'discussion', 'presentation', 'review', 'feedback'],
+    'development': ['code', 'bug', 'feature', 'commit', 'merge', 'deploy', 'test', 'debug'],
+    'support': ['help', 'assist', 'support', 'issue', 'problem', 'question', 'solution'],
+    'planning': ['plan', 'schedule', 'roadmap', 'strategy', 'goal', 'objective', 'milestone'],
+    'client_work': ['client', 'customer', 'user', 'requirement', 'specification', 'delivery']
+}
+URGENCY_INDICATORS = ['urgent', 'asap', 'immediate', 'critical', 'emergency', 'priority']
+POSITIVE_INDICATORS = ['success', 'completed', 'approved', 'good', 'excellent', 'perfect']
+NEGATIVE_INDICATORS = ['failed', 'error', 'problem', 'issue', 'bug', 'delayed']
+# Collector and report categories, in priority order (first with a hit wins)
+COLLECTOR_CATEGORIES = [
+    ('customer_support', ['ticket', 'soporte', 'support', 'problema', 'issue']),
+    ('development', ['code', 'github', 'deploy', 'development', 'bug', 'feature']),
+    ('meetings', ['meeting', 'reunion', 'call', 'zoom', 'teams']),
+    ('reports', ['reporte', 'report', 'informe'])
+]
+REPORT_CATEGORIES = [
+    ('Soporte', ['soporte', 'ticket', 'problema']),
+    ('Desarrollo', ['desarrollo', 'código', 'github']),
+    ('Reunión', ['reunión', 'meeting']),
+    ('Reporte', ['reporte', 'informe'])
+]
+
+EmailFeatures = namedtuple(
+    'EmailFeatures', ['category', 'sentiment', 'urgency', 'topics', 'collector_category', 'report_category']
+)
+
+class EmailFeatureExtractor:
+    """Computes every keyword label of an email in one pass over its normalized text"""
+    
+    def __init__(self):
+        groups = {('category', category): keywords for category, keywords in CATEGORY_KEYWORDS.items()}
+        groups[('sentiment', 'positive')] = POSITIVE_INDICATORS
+        groups[('sentiment', 'negative')] = NEGATIVE_INDICATORS
+        groups[('urgency', 'urgent')] = URGENCY_INDICATORS
+        groups.update({('collector', category): keywords for category, keywords in COLLECTOR_CATEGORIES})
+        groups.update({('report', category): keywords for category, keywords in REPORT_CATEGORIES})
+        self.matcher = KeywordMatcher(groups)
+    
+    def extract(self, email):
+        """Get the features of an email, computing and caching them on it the first time"""
+        features = email.get('features')
+        # Anything else (e.g. a list restored from JSON) is recomputed
+        if isinstance(features, EmailFeatures):
+            return features
+        
+        text = f"{email.get('subject', '')} {email.get('body', '')}".lower()
+        hits = self.matcher.count(text)
+        scores = {category: hits[('category', category)] for category in CATEGORY_KEYWORDS}
+        positive = hits[('sentiment', 'positive')]
+        negative = hits[('sentiment', 'negative')]
+        urgency = hits[('urgency', 'urgent')]
+        
+        features = EmailFeatures(
+            category=max(scores, key=scores.get) if max(scores.values()) else 'general',
+            sentiment='positive' if positive > negative else 'negative' if negative > positive else 'neutral',
+            urgency='high' if urgency >= 2 else 'medium' if urgency == 1 else 'low',
+            topics=tuple(category for category, score in scores.items() if score),
+            collector_category=next((c for c, _ in COLLECTOR_CATEGORIES if hits[('collector', c)]), 'other'),
+            report_category=next((c for c, _ in REPORT_CATEGORIES if hits[('report', c)]), 'General')
+        )
+        email['features'] = features
+        return features
+
+# Shared by the collector, analyzer and report generator so each email is scanned once
+extractor = EmailFeatureExtractor()
+
+def extract_features(email):
+    """Get the features of an email with the shared extractor"""
+    return extractor.extract(email)
\ No newline at end of file
@@ -0,0 +1,164 @@
+import json
+import sqlite3
+import threading
+from datetime import datetime
+
+class EmailStore:
+    """Local SQLite store of parsed Gmail messages used for incremental sync"""
+    
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.executescript('''
+            CREATE TABLE IF NOT EXISTS messages (
+                id TEXT PRIMARY KEY,
+                internal_date INTEGER NOT NULL,
+                label_ids TEXT NOT NULL,
+                data TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_messages_date ON messages (internal_date);
+            CREATE TABLE IF NOT EXISTS synced_ranges (
+                start INTEGER NOT NULL,
+                end INTEGER NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS meta (
+                key TEXT PRIMARY KEY,
+                value TEXT
+            );
+        ''')
+        self.conn.commit()
+    
+    def get_meta(self, key, default=None):
+        """Get a stored metadata value"""
+        with self.lock:
+            row = self.conn.execute('SELECT value FROM meta WHERE key = ?', (key,)).fetchone()
+        return row[0] if row else default
+    
+    def set_meta(self, key, value):
+        """Store a metadata value"""
+        with self.lock:
+            if value is None:
+                self.conn.execute('DELETE FROM meta WHERE key = ?', (key,))
+            else:
+                self.conn.execute('INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)', (key, str(value)))
+            self.conn.commit()
+    
+    def is_synced(self, start, end):
+        """Check if a period (epoch seconds) is fully covered by a synced range"""
+        with self.lock:
+            row = self.conn.execute(
+                'SELECT 1 FROM synced_ranges WHERE start <= ? AND end >= ? LIMIT 1', (start, end)
+            ).fetchone()
+        return row is not None
+    
+    def add_synced_range(self, start, end):
+        """Record a synced period, merging it with overlapping ranges"""
+        with self.lock:
+            overlapping = self.conn.execute(
+                'SELECT rowid, start, end FROM synced_ranges WHERE start <= ? AND end >= ?', (end, start)
+            ).fetchall()
+            for rowid, range_start, range_end in overlapping:
+                start = min(start, range_start)
+                end = max(end, range_end)
+                self.conn.execute('DELETE FROM synced_ranges WHERE rowid = ?', (rowid,))
+            self.conn.execute('INSERT INTO synced_ranges (start, end) VALUES (?, ?)', (start, end))
+            self.conn.commit()
+    
+    def clear_synced_ranges(self):
+        """Forget synced periods so they are listed again on the next sync"""
+        with self.lock:
+            self.conn.execute('DELETE FROM synced_ranges')
+            self.conn.commit()
+    
+    def clear(self):
+        """Remove all stored messages and synced periods"""
+        with self.lock:
+            self.conn.execute('DELETE FROM messages')
+            self.conn.execute('DELETE FROM synced_ranges')
+            self.conn.commit()
+    
+    def has_message(self, message_id):
+        """Check if a message is stored"""
+        with self.lock:
+            row = self.conn.execute('SELECT 1 FROM messages WHERE id = ?', (message_id,)).fetchone()
+        return row is not None
+    
+    def save_messages(self, messages):
+        """Insert or replace parsed messages"""
+        rows = [
+            (msg['id'], msg.get('internalDate', 0), json.dumps(msg.get('labelIds', [])), self._encode(msg))
+            for msg in messages
+        ]
+        with self.lock:
+            self.conn.executemany(
+                'INSERT OR REPLACE INTO messages (id, internal_date, label_ids, data) VALUES (?, ?, ?, ?)', rows
+            )
+            self.conn.commit()
+    
+    def update_labels(self, labels):
+        """Update label ids of stored messages from a {id: labelIds} mapping"""
+        with self.lock:
+            for message_id, label_ids in labels.items():
+                row = self.conn.execute('SELECT data FROM messages WHERE id = ?', (message_id,)).fetchone()
+                if not row:
+                    continue
+                data = json.loads(row[0])
+                data['labelIds'] = label_ids
+                self.conn.execute(
+                    'UPDATE messages SET label_ids = ?, data = ? WHERE id = ?',
+                    (json.dumps(label_ids), json.dumps(data), message_id)
+                )
+            self.conn.commit()
+    
+    def delete_messages(self, message_ids):
+        """Remove messages from the store"""
+        with self.lock:
+            self.conn.executemany('DELETE FROM messages WHERE id = ?', [(i,) for i in message_ids])
+            self.conn.commit()
+    
+    def get_message_ids(self, start, end):
+        """Get ids of stored messages within a period (epoch seconds)"""
+        with self.lock:
+            rows = self.conn.execute(
+                'SELECT id FROM messages WHERE internal_date >= ? AND internal_date < ?',
+                (start * 1000, end * 1000)
+            ).fetchall()
+        return {row[0] for row in rows}
+    
+    def get_messages(self, start, end, label=None):
+        """Get stored messages within a period (epoch seconds), newest first"""
+        with self.lock:
+            rows = self.conn.execute(
+                'SELECT label_ids, data FROM messages WHERE internal_date >= ? AND internal_date < ? '
+                'ORDER BY internal_date DESC',
+                (start * 1000, end * 1000)
+            ).fetchall()
+        
+        return [
+            self._decode(data) for label_ids, data in rows
+            if label is None or label in json.loads(label_ids)
+        ]
+    
+    def close(self):
+        """Close the database connection"""
+        with self.lock:
+            self.conn.close()
+    
+    @staticmethod
+    def _encode(msg):
+        """Serialize a parsed message to JSON"""
+        data = dict(msg)
+        # Features are derived from the content and recomputed when needed
+        data.pop('features', None)
+        if isinstance(data.get('datetime'), datetime):
+            data['datetime'] = data['datetime'].isoformat()
+        return json.dumps(data)
+    
+    @staticmethod
+    def _decode(data):
+        """Deserialize a parsed message from JSON"""
+        msg = json.loads(data)
+        if msg.get('datetime'):
+            msg['datetime'] = datetime.fromisoformat(msg['datetime'])
+        return msg
\ No newline at end of file
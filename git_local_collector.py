@@ -0,0 +1,126 @@
+import os
+import re
+import subprocess
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+
+# Record, field and header-end separators that cannot appear in commit metadata
+RECORD_SEP = b'\x1e'
+FIELD_SEP = '\x1f'
+HEADER_END = b'\x1d'
+LOG_FORMAT = '--format=%x1e%H%x1f%aI%x1f%B%x1d'
+GITHUB_REMOTE = re.compile(r'github\.com[:/](.+?)(?:\.git)?/?$')
+
+class LocalGitCollector:
+    """Commit history from local clones, read with git log --numstat instead of the API"""
+    
+    def __init__(self, repo_paths, authors=None, max_workers=4):
+        self.repo_paths = [os.path.abspath(os.path.expanduser(path)) for path in repo_paths]
+        self.authors = list(authors or [])
+        self.max_workers = max(1, max_workers)
+    
+    def get_repo_names(self):
+        """Get the names of the configured repositories"""
+        return {self._repo_name(path) for path in self.repo_paths}
+    
+    def get_commits(self, start_date, end_date):
+        """Get commits by the configured authors within date range, across all repos in parallel"""
+        if not self.repo_paths:
+            return []
+        
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(self.repo_paths))) as executor:
+            results = executor.map(lambda path: self._get_repo_commits(path, start_date, end_date), self.repo_paths)
+            commits = [commit for result in results for commit in result]
+        
+        return sorted(commits, key=lambda x: x['date'], reverse=True)
+    
+    def _get_repo_commits(self, path, start_date, end_date):
+        """Stream one repository's git log and parse its commits"""
+        authors = self.authors or [self._git(path, 'config', 'user.email')]
+        authors = [author for author in authors if author]
+        if not authors:
+            print(f"Skipping {path}: no author configured (set GIT_AUTHOR_EMAILS or git user.email)")
+            return []
+        
+        name = self._repo_name(path)
+        url = self._commit_url_base(path)
+        command = [
+            'git', '-C', path, 'log', '--numstat', '--no-color', '--fixed-strings', LOG_FORMAT,
+            f'--since={start_date.isoformat()}', f'--until={end_date.isoformat()}'
+        ] + [f'--author={author}' for author in authors]
+        
+        commits = []
+        try:
+            process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+        except OSError as e:
+            print(f"Error running git in {path}: {e}")
+            return []
+        
+        with process:
+            for record in self._iter_records(process.stdout):
+                commit = self._parse_record(record, name, url)
+                if commit:
+                    commits.append(commit)
+        
+        if process.returncode:
+            print(f"git log failed in {path} (exit code {process.returncode})")
+        return commits
+    
+    @staticmethod
+    def _iter_records(stream):
+        """Split git log output into per-commit records without reading it all into memory"""
+        buffer = b''
+        for chunk in iter(lambda: stream.read(1 << 16), b''):
+            buffer += chunk
+            *records, buffer = buffer.split(RECORD_SEP)
+            yield from records
+        yield buffer
+    
+    @staticmethod
+    def _parse_record(record, name, url):
+        """Parse one commit header and its numstat lines"""
+        header, found, numstat = record.partition(HEADER_END)
+        if not found:
+            return None
+        
+        sha, date, message = header.decode('utf-8', errors='replace').split(FIELD_SEP, 2)
+        additions = deletions = files_changed = 0
+        for line in numstat.splitlines():
+            parts = line.split(b'\t', 2)
+            if len(parts) != 3:
+                continue
+            # Binary files show '-' for both counts
+            if parts[0] != b'-':
+                additions += int(parts[0])
+                deletions += int(parts[1])
+            files_changed += 1
+        
+        return {
+            'repo': name,
+            'sha': sha[:7],
+            'message': message.rstrip('\n'),
+            'date': datetime.fromisoformat(date),
+            'additions': additions,
+            'deletions': deletions,
+            'files_changed': files_changed,
+            'url': f'{url}/commit/{sha}' if url else ''
+        }
+    
+    def _repo_name(self, path):
+        """Name a repo after its GitHub remote, falling back to the directory name"""
+        match = GITHUB_REMOTE.search(self._git(path, 'config', '--get', 'remote.origin.url'))
+        return match.group(1).split('/')[-1] if match else os.path.basename(path.rstrip(os.sep))
+    
+    def _commit_url_base(self, path):
+        """Get the GitHub web URL of a repo from its origin remote"""
+        match = GITHUB_REMOTE.search(self._git(path, 'config', '--get', 'remote.origin.url'))
+        return f'https://github.com/{match.group(1)}' if match else ''
+    
+    @staticmethod
+    def _git(path, *args):
+        """Run a short git command and return its stripped output, or '' on failure"""
+        try:
+            result = subprocess.run(['git', '-C', path] + list(args), capture_output=True, text=True)
+        except OSError:
+            return ''
+        return result.stdout.strip() if result.returncode == 0 else ''
\ No newline at end of file
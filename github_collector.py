@@ -1,11 +1,101 @@
-from github import Github
-from datetime import datetime, timedelta
+import time
+from github import Github, GithubException
+from datetime import datetime, timedelta, timezone
+from concurrent.futures import ThreadPoolExecutor
 from config import Config
+from request_scheduler import RequestScheduler
+from github_graphql import GitHubGraphQLClient, REPOS_PER_QUERY
+from http_cache import install_github_cache
+from git_local_collector import LocalGitCollector
+from github_store import GitHubStore
 
 class GitHubCollector:
-    def __init__(self):
-        self.github = Github(Config.GITHUB_TOKEN)
+    def __init__(self, store=None):
+        # Repeat fetches become conditional requests, which are free against the quota
+        self.http_cache = None
+        if Config.GITHUB_HTTP_CACHE:
+            self.http_cache = install_github_cache(Config.GITHUB_HTTP_CACHE, int(Config.GITHUB_HTTP_CACHE_MAX_MB * 1024 * 1024))
+        
+        # RequestScheduler does all pacing and retrying, so PyGithub's own retry and request spacing are off
+        self.github = Github(Config.GITHUB_TOKEN, retry=None, seconds_between_requests=None)
         self.user = self.github.get_user(Config.GITHUB_USERNAME) if Config.GITHUB_USERNAME else self.github.get_user()
+        self.scheduler = RequestScheduler('github', Config.GITHUB_REQUESTS_PER_SECOND, quota=self._get_quota)
+        
+        # GraphQL returns line stats with the history, avoiding a request per commit
+        self.graphql = None
+        if Config.GITHUB_USE_GRAPHQL and Config.GITHUB_TOKEN:
+            self.graphql = GitHubGraphQLClient(Config.GITHUB_TOKEN, self.scheduler)
+        
+        self.max_workers = max(1, Config.GITHUB_MAX_WORKERS)
+        
+        # Commits of locally cloned repos are mined with git instead of the API
+        self.local = None
+        if Config.GIT_LOCAL_REPOS:
+            self.local = LocalGitCollector(Config.GIT_LOCAL_REPOS, Config.GIT_AUTHOR_EMAILS, self.max_workers)
+        
+        # Previously collected activity, so later runs only fetch what is newer
+        if store is None and Config.GITHUB_INCREMENTAL_SYNC:
+            store = GitHubStore(Config.GITHUB_STORE_PATH)
+        self.store = store
+        self._fetch_failed = False
+        # Repos whose commits could not be fetched in the current run
+        self.failed_repos = []
+        
+        # Repository listing shared by the stages of one collection run
+        self._repos = None
+    
+    def _get_quota(self):
+        """Get the remaining REST quota and its reset time from the last response headers"""
+        remaining, _ = self.github.rate_limiting
+        return remaining, self.github.rate_limiting_resettime
+    
+    def _paginate(self, paginated):
+        """Iterate a PyGithub paginated list, scheduling each page request"""
+        per_page = getattr(self.github, 'per_page', 30)
+        page = 0
+        while True:
+            items = self.scheduler.call(paginated.get_page, page)
+            for item in items:
+                yield item
+            if len(items) < per_page:
+                break
+            page += 1
+    
+    def list_repos(self):
+        """List the user's repositories once, reusing the listing until the next run"""
+        if self._repos is None:
+            self._repos = list(self._paginate(self.user.get_repos()))
+        return self._repos
+    
+    def plan_repos(self, start_date, marks=None):
+        """Get repositories pushed to since the period start (and since their stored high-water mark)"""
+        start = _to_utc(start_date)
+        local_names = self.local.get_repo_names() if self.local else set()
+        marks = marks or {}
+        
+        planned = []
+        for repo in self.list_repos():
+            if repo.name in local_names or not repo.pushed_at:
+                continue
+            pushed_at = _to_utc(repo.pushed_at, naive_is_utc=True)
+            if pushed_at < start or (repo.name in marks and pushed_at.timestamp() <= marks[repo.name][0]):
+                continue
+            planned.append(repo)
+        return planned
+    
+    def _map_repos(self, func, items):
+        """Run a per-repository function over a bounded worker pool, keeping input order"""
+        if self.max_workers == 1 or len(items) < 2:
+            return [func(item) for item in items]
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(items))) as executor:
+            return list(executor.map(func, items))
+    
+    def get_request_stats(self):
+        """Get request, retry, throttling and cache counters"""
+        stats = self.scheduler.get_stats()
+        if self.http_cache:
+            stats['cache_hits'] = self.http_cache.get_stats()['hits']
+        return stats
     
     def get_activities(self, start_date, end_date):
         """Get GitHub activities within date range"""
@@ -17,105 +107,244 @@ class GitHubCollector:
             'reviews': []
         }
         
+        # List repos once per run for the commit and repository stages
+        self._repos = None
+        self.failed_repos = []
+        
         # Get commits
         activities['commits'] = self.get_commits(start_date, end_date)
         
-        # Get pull requests
-        activities['pull_requests'] = self.get_pull_requests(start_date, end_date)
-        
-        # Get issues
-        activities['issues'] = self.get_issues(start_date, end_date)
+        # Get pull requests and issues from one search
+        activities['pull_requests'], activities['issues'] = self.get_pull_requests_and_issues(start_date, end_date)
         
         # Get repository activities
         activities['repositories'] = self.get_repository_activities(start_date, end_date)
         
+        # Reported by main.py so missing commits are not mistaken for a quiet period
+        activities['failed_repos'] = sorted(set(self.failed_repos))
         return activities
     
     def get_commits(self, start_date, end_date):
         """Get commits made by user within date range"""
-        commits = []
+        commits = self.local.get_commits(start_date, end_date) if self.local else []
+        
+        if self.store:
+            remote_commits = self._get_stored_commits(start_date, end_date)
+        else:
+            remote_commits = self._fetch_commits(start_date, end_date)
+        
+        if not commits:
+            return remote_commits
+        return sorted(commits + remote_commits, key=lambda x: _to_utc(x['date'], naive_is_utc=True), reverse=True)
+    
+    def _get_stored_commits(self, start_date, end_date):
+        """Fetch only commits the store does not cover yet, then read the whole period from the store"""
+        start, end = _to_utc(start_date).timestamp(), _to_utc(end_date).timestamp()
+        fetch_end = min(end, time.time())
+        synced_end = self.store.synced_until('commits', start)
         
-        # Get all repos
-        for repo in self.user.get_repos():
+        if synced_end is None or synced_end < fetch_end:
+            marks = None
+            fetch_start = start_date
+            if synced_end is not None:
+                # Commits authored before the last run may have been pushed after it; the
+                # overlap re-fetches them and the store dedupes by sha
+                overlap_start = max(start, synced_end - Config.GITHUB_REVALIDATE_DAYS * 86400)
+                fetch_start = datetime.fromtimestamp(overlap_start, timezone.utc)
+                # Marks past the synced range may leave a gap before them, so they cannot prune
+                marks = {repo: mark for repo, mark in self.store.get_marks().items() if mark[0] <= synced_end}
+            
+            self._fetch_failed = False
+            self.store.save_commits(self._fetch_commits(fetch_start, end_date, marks))
+            if not self._fetch_failed:
+                self.store.add_synced_range('commits', start, fetch_end)
+        
+        return self.store.get_commits(start, end)
+    
+    def _fetch_commits(self, start_date, end_date, marks=None):
+        """Fetch commits from the API, through GraphQL when available"""
+        if self.graphql:
             try:
-                # Get commits from this repo
-                repo_commits = repo.get_commits(
-                    author=self.user,
-                    since=start_date,
-                    until=end_date
-                )
-                
-                for commit in repo_commits:
-                    commit_data = {
-                        'repo': repo.name,
-                        'sha': commit.sha[:7],
-                        'message': commit.commit.message,
-                        'date': commit.commit.author.date,
-                        'additions': commit.stats.additions,
-                        'deletions': commit.stats.deletions,
-                        'files_changed': len(commit.files),
-                        'url': commit.html_url
-                    }
-                    commits.append(commit_data)
+                return self._get_commits_graphql(start_date, end_date, marks)
             except Exception as e:
-                print(f"Error getting commits from {repo.name}: {e}")
-                continue
+                print(f"GraphQL commit collection failed, falling back to REST: {e}")
         
+        return self._get_commits_rest(start_date, end_date, marks)
+    
+    def _get_commits_graphql(self, start_date, end_date, marks=None):
+        """Get commits with line stats for all repos in a few paginated GraphQL queries"""
+        repos = [tuple(repo.full_name.split('/', 1)) for repo in self.plan_repos(start_date, marks)]
+        author_id = self.scheduler.call(getattr, self.user, 'node_id')
+        
+        chunks = [repos[i:i + REPOS_PER_QUERY] for i in range(0, len(repos), REPOS_PER_QUERY)]
+        results = self._map_repos(lambda chunk: self.graphql.get_commits(chunk, start_date, end_date, author_id), chunks)
+        
+        commits = [commit for result in results for commit in result]
         return sorted(commits, key=lambda x: x['date'], reverse=True)
     
-    def get_pull_requests(self, start_date, end_date):
-        """Get pull requests created or updated by user"""
+    def _get_commits_rest(self, start_date, end_date, marks=None):
+        """Get commits through the REST API, one extra request per commit for stats"""
+        repos = self.plan_repos(start_date, marks)
+        results = self._map_repos(lambda repo: self._get_repo_commits(repo, start_date, end_date), repos)
+        
+        commits = [commit for result in results for commit in result]
+        return sorted(commits, key=lambda x: x['date'], reverse=True)
+    
+    def _get_repo_commits(self, repo, start_date, end_date):
+        """Get commits made by user in one repository"""
+        commits = []
+        
+        try:
+            # Get commits from this repo
+            repo_commits = repo.get_commits(
+                author=self.user,
+                since=start_date,
+                until=end_date
+            )
+            
+            for commit in self._paginate(repo_commits):
+                # Stats and files come from one lazy per-commit request
+                stats = self.scheduler.call(getattr, commit, 'stats')
+                commit_data = {
+                    'repo': repo.name,
+                    'sha': commit.sha[:7],
+                    'message': commit.commit.message,
+                    'date': commit.commit.author.date,
+                    'additions': stats.additions,
+                    'deletions': stats.deletions,
+                    'files_changed': len(commit.files),
+                    'url': commit.html_url
+                }
+                commits.append(commit_data)
+        except Exception as e:
+            # Empty repositories answer the listing with 409 Conflict; any other error left after
+            # the scheduler's retries is reported rather than passed off as a quiet repo
+            if not (isinstance(e, GithubException) and e.status == 409):
+                print(f"Error getting commits from {repo.name}: {e}")
+                self.failed_repos.append(repo.name)
+                self._fetch_failed = True
+        
+        return commits
+    
+    def iter_search_pages(self, start_date, end_date, field='created'):
+        """Yield pages of ('pull_request'|'issue', dict) items authored by user, from one search"""
+        until = _search_date(end_date) if end_date else '*'
+        query = f"author:{self.user.login} {field}:{_search_date(start_date)}..{until}"
+        
+        if self.graphql:
+            pages = self.graphql.iter_search(query)
+            try:
+                # Fall back to REST only if the very first page fails
+                first = next(pages)
+            except StopIteration:
+                return
+            except Exception as e:
+                print(f"GraphQL search failed, falling back to REST: {e}")
+            else:
+                yield first
+                yield from pages
+                return
+        
+        yield from self._iter_search_pages_rest(query)
+    
+    def _iter_search_pages_rest(self, query):
+        """Yield pages of a REST issue search covering both pull requests and issues"""
+        results = self.github.search_issues(query=query)
+        per_page = getattr(self.github, 'per_page', 30)
+        page = 0
+        while True:
+            items = self.scheduler.call(results.get_page, page)
+            yield [self._parse_search_item(item) for item in items]
+            if len(items) < per_page:
+                break
+            page += 1
+    
+    @staticmethod
+    def _parse_search_item(item):
+        """Convert a REST search result, reading inline fields only to avoid per-item requests"""
+        data = {
+            # html_url is https://github.com/<owner>/<repo>/(pull|issues)/<number>
+            'repo': item.html_url.split('/')[4],
+            'number': item.number,
+            'title': item.title,
+            'state': item.state,
+            'created_at': item.created_at,
+            'updated_at': item.updated_at,
+            'url': item.html_url,
+            'labels': [label.name for label in item.labels]
+        }
+        # item.pull_request is unset on issues, and reading it makes PyGithub fetch the whole issue
+        pull_request = item.raw_data.get('pull_request')
+        if pull_request:
+            data['merged'] = pull_request.get('merged_at') is not None
+            return 'pull_request', data
+        
+        data['comments'] = item.comments
+        return 'issue', data
+    
+    def get_pull_requests_and_issues(self, start_date, end_date):
+        """Get pull requests and issues created by user, split from one search"""
+        if self.store:
+            return self._get_stored_items(start_date, end_date)
+        
         pull_requests = []
+        issues = []
         
-        # Search for PRs
-        query = f"author:{self.user.login} created:{start_date.isoformat()}..{end_date.isoformat()}"
-        prs = self.github.search_issues(query=query, type='pr')
-        
-        for pr in prs:
-            pr_data = {
-                'repo': pr.repository.name,
-                'number': pr.number,
-                'title': pr.title,
-                'state': pr.state,
-                'created_at': pr.created_at,
-                'updated_at': pr.updated_at,
-                'merged': pr.pull_request.merged_at is not None if pr.pull_request else False,
-                'url': pr.html_url,
-                'labels': [label.name for label in pr.labels]
-            }
-            pull_requests.append(pr_data)
-        
-        return pull_requests
+        for page in self.iter_search_pages(start_date, end_date):
+            for kind, data in page:
+                (pull_requests if kind == 'pull_request' else issues).append(data)
+        
+        return pull_requests, issues
+    
+    def _get_stored_items(self, start_date, end_date):
+        """Search only the part of the period the store does not cover, then read it from the store"""
+        start, end = _to_utc(start_date).timestamp(), _to_utc(end_date).timestamp()
+        fetch_end = min(end, time.time())
+        synced_end = self.store.synced_until('items', start)
+        
+        # Stored PRs and issues may have been merged, closed or relabelled since
+        if synced_end is not None:
+            self.revalidate_items()
+        
+        if synced_end is None or synced_end < fetch_end:
+            fetch_start = start_date if synced_end is None else datetime.fromtimestamp(synced_end, timezone.utc)
+            for page in self.iter_search_pages(fetch_start, end_date):
+                self.store.save_items(page)
+            self.store.add_synced_range('items', start, fetch_end)
+        
+        return self.store.get_items('pull_request', start, end), self.store.get_items('issue', start, end)
+    
+    def revalidate_items(self, days=None):
+        """Re-fetch stored PRs and issues updated since the last check, or within the last days"""
+        if not self.store:
+            return 0
+        
+        checked_at = time.time()
+        since = self.store.get_meta('items_checked_at')
+        if days is not None or since is None:
+            since = checked_at - (Config.GITHUB_REVALIDATE_DAYS if days is None else days) * 86400
+        
+        count = 0
+        for page in self.iter_search_pages(datetime.fromtimestamp(float(since), timezone.utc), None, field='updated'):
+            self.store.save_items(page)
+            count += len(page)
+        
+        self.store.set_meta('items_checked_at', checked_at)
+        return count
+    
+    def get_pull_requests(self, start_date, end_date):
+        """Get pull requests created or updated by user"""
+        return self.get_pull_requests_and_issues(start_date, end_date)[0]
     
     def get_issues(self, start_date, end_date):
         """Get issues created or updated by user"""
-        issues = []
-        
-        # Search for issues
-        query = f"author:{self.user.login} created:{start_date.isoformat()}..{end_date.isoformat()}"
-        issues_result = self.github.search_issues(query=query, type='issue')
-        
-        for issue in issues_result:
-            issue_data = {
-                'repo': issue.repository.name,
-                'number': issue.number,
-                'title': issue.title,
-                'state': issue.state,
-                'created_at': issue.created_at,
-                'updated_at': issue.updated_at,
-                'url': issue.html_url,
-                'labels': [label.name for label in issue.labels],
-                'comments': issue.comments
-            }
-            issues.append(issue_data)
-        
-        return issues
+        return self.get_pull_requests_and_issues(start_date, end_date)[1]
     
     def get_repository_activities(self, start_date, end_date):
         """Get repository creation/updates"""
         repo_activities = []
         
-        for repo in self.user.get_repos():
+        for repo in self.list_repos():
             # Check if repo was created or significantly updated in the period
             if start_date <= repo.created_at <= end_date:
                 repo_activities.append({
@@ -158,4 +387,18 @@ class GitHubCollector:
             if repo['language']:
                 stats['languages'][repo['language']] = stats['languages'].get(repo['language'], 0) + 1
         
-        return stats
\ No newline at end of file
+        return stats
+
+def _to_utc(value, naive_is_utc=False):
+    """Convert a date or datetime to aware UTC; naive values are local time unless PyGithub's UTC"""
+    if not isinstance(value, datetime):
+        value = datetime(value.year, value.month, value.day)
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc) if naive_is_utc else value.astimezone()
+    return value.astimezone(timezone.utc)
+
+def _search_date(value):
+    """Format a date for a search qualifier, in UTC when it carries a timezone"""
+    if isinstance(value, datetime) and value.tzinfo is not None:
+        return value.astimezone(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+    return value.isoformat()
\ No newline at end of file
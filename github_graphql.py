@@ -0,0 +1,195 @@
+import json
+import requests
+from datetime import datetime, time
+
+GRAPHQL_URL = 'https://api.github.com/graphql'
+# Repositories queried together through aliases in one request
+REPOS_PER_QUERY = 10
+COMMITS_PER_PAGE = 100
+SEARCH_PER_PAGE = 100
+
+COMMIT_FIELDS = '''
+    pageInfo { hasNextPage endCursor }
+    nodes {
+        oid
+        message
+        url
+        author { date }
+        additions
+        deletions
+        changedFilesIfAvailable
+    }
+'''
+
+SEARCH_QUERY = '''
+query($query: String!, $after: String) {
+    search(query: $query, type: ISSUE, first: %d, after: $after) {
+        pageInfo { hasNextPage endCursor }
+        nodes {
+            __typename
+            ... on PullRequest {
+                number title state merged url createdAt updatedAt
+                repository { name }
+                labels(first: 50) { nodes { name } }
+            }
+            ... on Issue {
+                number title state url createdAt updatedAt
+                repository { name }
+                labels(first: 50) { nodes { name } }
+                comments { totalCount }
+            }
+        }
+    }
+}
+''' % SEARCH_PER_PAGE
+
+class GitHubGraphQLError(Exception):
+    """GraphQL errors, with a status the request scheduler can act on"""
+    
+    def __init__(self, errors, status=None, headers=None):
+        super().__init__('; '.join(error.get('message', str(error)) for error in errors))
+        self.errors = errors
+        self.status = status
+        self.headers = headers or {}
+
+class GitHubGraphQLClient:
+    """Minimal GitHub GraphQL client whose requests go through a RequestScheduler"""
+    
+    def __init__(self, token, scheduler):
+        self.scheduler = scheduler
+        self.session = requests.Session()
+        self.session.headers.update({'Authorization': f'bearer {token}'})
+    
+    def query(self, query, variables=None):
+        """Run a GraphQL query and return its data"""
+        return self.scheduler.call(self._post, query, variables or {})
+    
+    def _post(self, query, variables):
+        try:
+            response = self.session.post(GRAPHQL_URL, json={'query': query, 'variables': variables}, timeout=60)
+        except (requests.ConnectionError, requests.Timeout) as e:
+            # Let the scheduler retry network failures
+            raise ConnectionError(str(e)) from e
+        self.scheduler.observe_headers(response.headers)
+        response.raise_for_status()
+        
+        payload = response.json()
+        errors = payload.get('errors')
+        if errors:
+            # Primary rate limits come back as 200 with a RATE_LIMITED error
+            if any(error.get('type') == 'RATE_LIMITED' for error in errors):
+                raise GitHubGraphQLError(errors, status=429, headers=dict(response.headers))
+            # Partial data leaves the errored aliases null, which would read as empty results
+            raise GitHubGraphQLError(errors)
+        return payload['data']
+    
+    def get_commits(self, repos, since, until, author_id):
+        """Get commit history with line stats for many (owner, name) repos in few queries"""
+        pending = {f'r{i}': {'owner': owner, 'name': name, 'cursor': None} for i, (owner, name) in enumerate(repos)}
+        commits = []
+        
+        while pending:
+            aliases = list(pending)[:REPOS_PER_QUERY]
+            data = self.query(self._build_commits_query(aliases, pending), {
+                'since': _iso(since),
+                'until': _iso(until),
+                'author': author_id
+            })
+            
+            for alias in aliases:
+                repo = pending[alias]
+                history = _get_history(data.get(alias))
+                if history is None:
+                    # Empty repository or no default branch
+                    del pending[alias]
+                    continue
+                
+                for node in history['nodes']:
+                    commits.append({
+                        'repo': repo['name'],
+                        'sha': node['oid'][:7],
+                        'message': node['message'],
+                        'date': _parse_datetime(node['author']['date']),
+                        'additions': node['additions'],
+                        'deletions': node['deletions'],
+                        'files_changed': node['changedFilesIfAvailable'] or 0,
+                        'url': node['url']
+                    })
+                
+                if history['pageInfo']['hasNextPage']:
+                    repo['cursor'] = history['pageInfo']['endCursor']
+                else:
+                    del pending[alias]
+        
+        return commits
+    
+    def iter_search(self, query):
+        """Yield pages of pull requests and issues matching a search, as ('pull_request'|'issue', dict)"""
+        after = None
+        while True:
+            search = self.query(SEARCH_QUERY, {'query': query, 'after': after})['search']
+            
+            page = []
+            for node in search['nodes']:
+                if not node:
+                    continue
+                item = {
+                    'repo': node['repository']['name'],
+                    'number': node['number'],
+                    'title': node['title'],
+                    # REST reports merged pull requests as closed
+                    'state': 'closed' if node['state'] == 'MERGED' else node['state'].lower(),
+                    'created_at': _parse_datetime(node['createdAt']),
+                    'updated_at': _parse_datetime(node['updatedAt']),
+                    'url': node['url'],
+                    'labels': [label['name'] for label in node['labels']['nodes']]
+                }
+                if node['__typename'] == 'PullRequest':
+                    item['merged'] = node['merged']
+                    page.append(('pull_request', item))
+                else:
+                    item['comments'] = node['comments']['totalCount']
+                    page.append(('issue', item))
+            yield page
+            
+            if not search['pageInfo']['hasNextPage']:
+                break
+            after = search['pageInfo']['endCursor']
+    
+    @staticmethod
+    def _build_commits_query(aliases, pending):
+        """Build one query with an aliased history lookup per repository"""
+        parts = []
+        for alias in aliases:
+            repo = pending[alias]
+            after = json.dumps(repo['cursor']) if repo['cursor'] else 'null'
+            parts.append(f'''
+                {alias}: repository(owner: {json.dumps(repo['owner'])}, name: {json.dumps(repo['name'])}) {{
+                    defaultBranchRef {{
+                        target {{
+                            ... on Commit {{
+                                history(first: {COMMITS_PER_PAGE}, after: {after}, since: $since, until: $until, author: {{id: $author}}) {{
+                                    {COMMIT_FIELDS}
+                                }}
+                            }}
+                        }}
+                    }}
+                }}''')
+        
+        return 'query($since: GitTimestamp!, $until: GitTimestamp!, $author: ID!) {' + ''.join(parts) + '\n}'
+
+def _get_history(repository):
+    """Get the commit history connection of an aliased repository result"""
+    if not repository or not repository.get('defaultBranchRef'):
+        return None
+    return (repository['defaultBranchRef'].get('target') or {}).get('history')
+
+def _iso(value):
+    """Format a date or datetime as an ISO-8601 timestamp with timezone"""
+    if not isinstance(value, datetime):
+        value = datetime.combine(value, time())
+    return value.astimezone().isoformat()
+
+def _parse_datetime(value):
+    """Parse a GitHub ISO-8601 timestamp into an aware datetime"""
+    return datetime.fromisoformat(value.replace('Z', '+00:00'))
\ No newline at end of file
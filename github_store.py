@@ -0,0 +1,234 @@
+import sys
+import json
+import sqlite3
+import argparse
+import threading
+from datetime import datetime, timezone
+
+# Fields of commit, PR and issue records that hold datetimes
+DATE_FIELDS = ('date', 'created_at', 'updated_at')
+
+class GitHubStore:
+    """Local SQLite store of collected GitHub commits, pull requests and issues"""
+    
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.executescript('''
+            CREATE TABLE IF NOT EXISTS commits (
+                repo TEXT NOT NULL,
+                sha TEXT NOT NULL,
+                date REAL NOT NULL,
+                data TEXT NOT NULL,
+                PRIMARY KEY (repo, sha)
+            );
+            CREATE INDEX IF NOT EXISTS idx_commits_date ON commits (date);
+            CREATE TABLE IF NOT EXISTS items (
+                kind TEXT NOT NULL,
+                repo TEXT NOT NULL,
+                number INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL,
+                data TEXT NOT NULL,
+                PRIMARY KEY (kind, repo, number)
+            );
+            CREATE INDEX IF NOT EXISTS idx_items_created ON items (created_at);
+            CREATE TABLE IF NOT EXISTS repo_marks (
+                repo TEXT PRIMARY KEY,
+                last_date REAL NOT NULL,
+                last_sha TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS synced_ranges (
+                kind TEXT NOT NULL,
+                start REAL NOT NULL,
+                end REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS meta (
+                key TEXT PRIMARY KEY,
+                value TEXT
+            );
+        ''')
+        self.conn.commit()
+    
+    def get_meta(self, key, default=None):
+        """Get a stored metadata value"""
+        with self.lock:
+            row = self.conn.execute('SELECT value FROM meta WHERE key = ?', (key,)).fetchone()
+        return row[0] if row else default
+    
+    def set_meta(self, key, value):
+        """Store a metadata value"""
+        with self.lock:
+            self.conn.execute('INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)', (key, str(value)))
+            self.conn.commit()
+    
+    def synced_until(self, kind, start):
+        """Get how far the synced range containing start (epoch seconds) reaches, or None"""
+        with self.lock:
+            row = self.conn.execute(
+                'SELECT MAX(end) FROM synced_ranges WHERE kind = ? AND start <= ? AND end >= ?', (kind, start, start)
+            ).fetchone()
+        return row[0]
+    
+    def add_synced_range(self, kind, start, end):
+        """Record a synced period, merging it with overlapping ranges of the same kind"""
+        with self.lock:
+            self._add_synced_range(kind, start, end)
+            self.conn.commit()
+    
+    def _add_synced_range(self, kind, start, end):
+        overlapping = self.conn.execute(
+            'SELECT rowid, start, end FROM synced_ranges WHERE kind = ? AND start <= ? AND end >= ?', (kind, end, start)
+        ).fetchall()
+        for rowid, range_start, range_end in overlapping:
+            start = min(start, range_start)
+            end = max(end, range_end)
+            self.conn.execute('DELETE FROM synced_ranges WHERE rowid = ?', (rowid,))
+        self.conn.execute('INSERT INTO synced_ranges (kind, start, end) VALUES (?, ?, ?)', (kind, start, end))
+    
+    def get_marks(self):
+        """Get the newest commit (date, sha) seen in each repository"""
+        with self.lock:
+            rows = self.conn.execute('SELECT repo, last_date, last_sha FROM repo_marks').fetchall()
+        return {repo: (last_date, last_sha) for repo, last_date, last_sha in rows}
+    
+    def save_commits(self, commits):
+        """Insert or replace commits and advance per-repo high-water marks"""
+        rows = [(c['repo'], c['sha'], _epoch(c['date']), self._encode(c)) for c in commits]
+        with self.lock:
+            self.conn.executemany('INSERT OR REPLACE INTO commits (repo, sha, date, data) VALUES (?, ?, ?, ?)', rows)
+            for repo, sha, date, _ in rows:
+                self.conn.execute(
+                    'INSERT INTO repo_marks (repo, last_date, last_sha) VALUES (?, ?, ?) '
+                    'ON CONFLICT (repo) DO UPDATE SET last_date = excluded.last_date, last_sha = excluded.last_sha '
+                    'WHERE excluded.last_date > repo_marks.last_date',
+                    (repo, date, sha)
+                )
+            self.conn.commit()
+    
+    def get_commits(self, start, end):
+        """Get stored commits within a period (epoch seconds), newest first"""
+        with self.lock:
+            rows = self.conn.execute(
+                'SELECT data FROM commits WHERE date >= ? AND date < ? ORDER BY date DESC', (start, end)
+            ).fetchall()
+        return [self._decode(row[0]) for row in rows]
+    
+    def save_items(self, items):
+        """Insert or replace ('pull_request'|'issue', dict) search items"""
+        rows = [
+            (kind, item['repo'], item['number'], _epoch(item['created_at']), _epoch(item['updated_at']), self._encode(item))
+            for kind, item in items
+        ]
+        with self.lock:
+            self.conn.executemany(
+                'INSERT OR REPLACE INTO items (kind, repo, number, created_at, updated_at, data) VALUES (?, ?, ?, ?, ?, ?)',
+                rows
+            )
+            self.conn.commit()
+    
+    def get_items(self, kind, start, end):
+        """Get stored pull requests or issues created within a period (epoch seconds)"""
+        with self.lock:
+            rows = self.conn.execute(
+                'SELECT data FROM items WHERE kind = ? AND created_at >= ? AND created_at < ? ORDER BY created_at DESC',
+                (kind, start, end)
+            ).fetchall()
+        return [self._decode(row[0]) for row in rows]
+    
+    def compact(self, before=None):
+        """Optionally drop data older than before (epoch seconds), then merge ranges and reclaim space"""
+        with self.lock:
+            if before is not None:
+                self.conn.execute('DELETE FROM commits WHERE date < ?', (before,))
+                self.conn.execute('DELETE FROM items WHERE created_at < ?', (before,))
+                self.conn.execute('DELETE FROM synced_ranges WHERE end <= ?', (before,))
+                self.conn.execute('UPDATE synced_ranges SET start = ? WHERE start < ?', (before, before))
+            
+            # Re-merge ranges left overlapping by interrupted runs
+            ranges = self.conn.execute('SELECT kind, start, end FROM synced_ranges ORDER BY kind, start').fetchall()
+            self.conn.execute('DELETE FROM synced_ranges')
+            for kind, start, end in ranges:
+                self._add_synced_range(kind, start, end)
+            self.conn.commit()
+            self.conn.execute('VACUUM')
+    
+    def get_stats(self):
+        """Get row counts and synced ranges of the store"""
+        with self.lock:
+            stats = {
+                'commits': self.conn.execute('SELECT COUNT(*) FROM commits').fetchone()[0],
+                'pull_requests': self.conn.execute("SELECT COUNT(*) FROM items WHERE kind = 'pull_request'").fetchone()[0],
+                'issues': self.conn.execute("SELECT COUNT(*) FROM items WHERE kind = 'issue'").fetchone()[0],
+                'repos': self.conn.execute('SELECT COUNT(*) FROM repo_marks').fetchone()[0],
+                'synced_ranges': self.conn.execute('SELECT kind, start, end FROM synced_ranges ORDER BY kind, start').fetchall()
+            }
+        return stats
+    
+    def close(self):
+        """Close the database connection"""
+        with self.lock:
+            self.conn.close()
+    
+    @staticmethod
+    def _encode(record):
+        """Serialize a record to JSON"""
+        data = dict(record)
+        for field in DATE_FIELDS:
+            if isinstance(data.get(field), datetime):
+                data[field] = data[field].isoformat()
+        return json.dumps(data)
+    
+    @staticmethod
+    def _decode(data):
+        """Deserialize a record from JSON"""
+        record = json.loads(data)
+        for field in DATE_FIELDS:
+            if record.get(field):
+                record[field] = datetime.fromisoformat(record[field])
+        return record
+
+def _epoch(value):
+    """Get epoch seconds of a datetime; naive values are UTC as PyGithub returns them"""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+def main(argv=None):
+    """Inspect, compact or re-validate the GitHub store"""
+    from config import Config
+    
+    parser = argparse.ArgumentParser(description='Maintain the local GitHub activity store')
+    parser.add_argument('--path', default=Config.GITHUB_STORE_PATH)
+    commands = parser.add_subparsers(dest='command', required=True)
+    commands.add_parser('stats', help='show stored record counts and synced ranges')
+    compact = commands.add_parser('compact', help='merge synced ranges and reclaim space')
+    compact.add_argument('--before', help='also drop records created before this date (YYYY-MM-DD)')
+    check = commands.add_parser('check', help='re-fetch PRs and issues updated recently')
+    check.add_argument('--days', type=int, default=Config.GITHUB_REVALIDATE_DAYS)
+    args = parser.parse_args(argv)
+    
+    store = GitHubStore(args.path)
+    if args.command == 'check':
+        # The store at --path is used whether or not incremental sync is turned on
+        from github_collector import GitHubCollector
+        collector = GitHubCollector(store=store)
+        print(f"Re-validated {collector.revalidate_items(days=args.days)} pull requests and issues")
+        store.close()
+        return
+    
+    if args.command == 'compact':
+        before = datetime.strptime(args.before, '%Y-%m-%d').timestamp() if args.before else None
+        store.compact(before)
+        print(f"Compacted {args.path}")
+    
+    stats = store.get_stats()
+    print(f"{stats['commits']} commits, {stats['pull_requests']} pull requests, {stats['issues']} issues "
+          f"across {stats['repos']} repos")
+    for kind, start, end in stats['synced_ranges']:
+        print(f"  {kind}: {datetime.fromtimestamp(start):%Y-%m-%d %H:%M} to {datetime.fromtimestamp(end):%Y-%m-%d %H:%M}")
+    store.close()
+
+if __name__ == '__main__':
+    sys.exit(main())
\ No newline at end of file
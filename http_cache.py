@@ -0,0 +1,160 @@
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from requests import Response
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from github.Requester import Requester, HTTPSRequestsConnectionClass
+
+class HttpCache:
+    """Persistent, size-bounded LRU cache of HTTP responses with their validators"""
+    
+    def __init__(self, path, max_bytes):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0, 'stored': 0, 'evicted': 0}
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.executescript('''
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                headers TEXT NOT NULL,
+                body TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                accessed REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_responses_accessed ON responses (accessed);
+        ''')
+        self.conn.commit()
+    
+    @staticmethod
+    def make_key(verb, url, headers):
+        """Key a request by method, URL (with query string) and credentials"""
+        auth = (headers or {}).get('Authorization', '')
+        return hashlib.sha256(f'{verb} {url} {auth}'.encode('utf-8')).hexdigest()
+    
+    def get(self, key):
+        """Get the (headers, body) stored for a key, marking it recently used"""
+        with self.lock:
+            row = self.conn.execute('SELECT headers, body FROM responses WHERE key = ?', (key,)).fetchone()
+            if row:
+                self.conn.execute('UPDATE responses SET accessed = ? WHERE key = ?', (time.time(), key))
+                self.conn.commit()
+        return (json.loads(row[0]), row[1]) if row else None
+    
+    def put(self, key, headers, body):
+        """Store a response, evicting the least recently used ones over the size limit"""
+        size = len(body.encode('utf-8'))
+        if self.max_bytes and size > self.max_bytes:
+            return
+        
+        with self.lock:
+            self.conn.execute(
+                'INSERT OR REPLACE INTO responses (key, headers, body, size, accessed) VALUES (?, ?, ?, ?, ?)',
+                (key, json.dumps(headers), body, size, time.time())
+            )
+            self.stats['stored'] += 1
+            self._evict()
+            self.conn.commit()
+    
+    def _evict(self):
+        if not self.max_bytes:
+            return
+        total = self.conn.execute('SELECT COALESCE(SUM(size), 0) FROM responses').fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        
+        for key, size in self.conn.execute('SELECT key, size FROM responses ORDER BY accessed').fetchall():
+            if total <= self.max_bytes:
+                break
+            self.conn.execute('DELETE FROM responses WHERE key = ?', (key,))
+            total -= size
+            self.stats['evicted'] += 1
+    
+    def count(self, key):
+        """Add one to a hit/miss counter"""
+        with self.lock:
+            self.stats[key] += 1
+    
+    def get_stats(self):
+        """Get cache hit, miss, store and eviction counters"""
+        with self.lock:
+            return dict(self.stats)
+    
+    def clear(self):
+        """Remove all cached responses"""
+        with self.lock:
+            self.conn.execute('DELETE FROM responses')
+            self.conn.commit()
+
+class CachingAdapter(HTTPAdapter):
+    """requests adapter that revalidates cached GET responses with ETag/Last-Modified"""
+    
+    def __init__(self, cache, **kwargs):
+        super().__init__(**kwargs)
+        self.cache = cache
+    
+    def send(self, request, **kwargs):
+        if request.method.upper() != 'GET':
+            return super().send(request, **kwargs)
+        
+        key = HttpCache.make_key(request.method.upper(), request.url, request.headers)
+        cached = self.cache.get(key)
+        if cached:
+            cached_headers, body = cached
+            # Conditional requests answered with 304 do not count against the rate limit
+            if 'etag' in cached_headers:
+                request.headers['If-None-Match'] = cached_headers['etag']
+            if 'last-modified' in cached_headers:
+                request.headers['If-Modified-Since'] = cached_headers['last-modified']
+        
+        response = super().send(request, **kwargs)
+        headers = {str(k).lower(): v for k, v in response.headers.items()}
+        
+        if response.status_code == 304 and cached:
+            self.cache.count('hits')
+            # Fresh rate limit headers, cached representation headers
+            cached_headers.update({k: v for k, v in headers.items() if k.startswith('x-ratelimit') or k == 'date'})
+            response.close()
+            return self._cached_response(request, cached_headers, body)
+        
+        self.cache.count('misses')
+        if response.status_code == 200 and ('etag' in headers or 'last-modified' in headers):
+            self.cache.put(key, headers, response.text)
+        return response
+    
+    @staticmethod
+    def _cached_response(request, headers, body):
+        """Build the 200 response a 304 stands for from the cached body"""
+        response = Response()
+        response.status_code = 200
+        response.headers = CaseInsensitiveDict(headers)
+        response._content = body.encode('utf-8')
+        response.encoding = 'utf-8'
+        response.url = request.url
+        response.request = request
+        return response
+
+class CachingHTTPSConnection(HTTPSRequestsConnectionClass):
+    """PyGithub HTTPS connection whose session sends requests through the caching adapter"""
+    
+    cache = None
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if self.cache is not None:
+            self.adapter = CachingAdapter(
+                self.cache, max_retries=self.retry, pool_connections=self.pool_size, pool_maxsize=self.pool_size
+            )
+            self.session.mount('https://', self.adapter)
+
+def install_github_cache(path, max_bytes):
+    """Route every PyGithub requester through the response cache"""
+    if CachingHTTPSConnection.cache is None or CachingHTTPSConnection.cache.path != path:
+        CachingHTTPSConnection.cache = HttpCache(path, max_bytes)
+    # Requester.injectConnectionClasses would also turn off connection persistence, giving every
+    # call a new session and closing connections other threads still use, so only swap the class
+    Requester._Requester__httpsConnectionClass = CachingHTTPSConnection
+    return CachingHTTPSConnection.cache
\ No newline at end of file
@@ -0,0 +1,124 @@
+import re
+from collections import Counter
+
+WORD = re.compile(r'\w+')
+# Distinct tokens whose keyword hits are remembered before the memo is cleared
+MAX_CACHED_TOKENS = 200000
+# Tokenizing a text costs about as much as this many substring scans of it that find nothing
+TOKENIZE_COST_IN_SCANS = 24
+
+class KeywordMatcher:
+    """Finds every keyword of several labelled keyword lists in a text, tokenizing it once or scanning for each keyword"""
+    
+    def __init__(self, groups, word_boundary=False):
+        self.word_boundary = word_boundary
+        # Labels of each keyword, so a keyword in several lists counts once for each
+        self.labels = {}
+        for label, keywords in groups.items():
+            for keyword in keywords:
+                self.labels.setdefault(keyword.lower(), []).append(label)
+        # Keywords of each label, for counting straight from substring scans when no keyword
+        # is in several lists (a shared keyword would be scanned for once per list)
+        self.groups = {}
+        for keyword, labels in self.labels.items():
+            for label in labels:
+                self.groups.setdefault(label, []).append(keyword)
+        self.scores_per_label = all(len(labels) == 1 for labels in self.labels.values())
+        
+        # A keyword without spaces always lies within one whitespace-separated token (one word with boundaries)
+        is_word = WORD.fullmatch if word_boundary else lambda keyword: len(keyword.split()) == 1
+        words = [keyword for keyword in self.labels if is_word(keyword)]
+        self.words = frozenset(words)
+        self.word_pattern = self._compile(words)
+        # Keywords spanning several tokens (e.g. 'how to') are looked for in the whole text
+        self.phrases = [keyword for keyword in self.labels if not is_word(keyword)]
+        self.phrase_pattern = None
+        if word_boundary and self.phrases:
+            self.phrase_pattern = re.compile(
+                r'\b(?:' + '|'.join(re.escape(phrase) for phrase in self.phrases) + r')\b'
+            )
+        # Keyword hits of tokens seen before, and the (far more common) tokens without any
+        self.token_hits = {}
+        self.tokens_without_hits = set()
+        # Running share of the keywords found per text
+        self.hit_ratio = 0.0
+    
+    @staticmethod
+    def _compile(keywords):
+        """Compile an alternation that reports every keyword within a token, overlapping ones included"""
+        if not keywords:
+            return None
+        # Longest first, so each position reports the longest keyword starting there
+        alternation = '|'.join(re.escape(keyword) for keyword in sorted(keywords, key=len, reverse=True))
+        pattern = re.compile(rf'(?=({alternation}))')
+        # Shorter keywords starting where a longer one matched are hits as well
+        prefixes = {keyword: frozenset(other for other in keywords if keyword.startswith(other)) for keyword in keywords}
+        return pattern, prefixes
+    
+    def _match_token(self, token):
+        """Get the keywords within one token, remembering them for the next texts"""
+        hits = self.token_hits.get(token)
+        if hits is None:
+            if len(self.token_hits) + len(self.tokens_without_hits) >= MAX_CACHED_TOKENS:
+                self.token_hits.clear()
+                self.tokens_without_hits.clear()
+            pattern, prefixes = self.word_pattern
+            hits = frozenset(prefix for keyword in set(pattern.findall(token)) for prefix in prefixes[keyword])
+            if hits:
+                self.token_hits[token] = hits
+            else:
+                self.tokens_without_hits.add(token)
+        return hits
+    
+    def _scans(self):
+        """Whether scanning for each keyword is expected to be cheaper than tokenizing the text"""
+        # A keyword search stops at its first occurrence, so with few keywords, or texts
+        # holding most of them, scanning for each keyword is cheaper than tokenizing
+        return len(self.words) * (1 - self.hit_ratio) < TOKENIZE_COST_IN_SCANS
+    
+    def _record_hits(self, share):
+        """Fold the share of the keywords found in one text into the running hit ratio"""
+        self.hit_ratio = 0.9 * self.hit_ratio + 0.1 * share
+    
+    def find(self, text):
+        """Get the distinct keywords occurring in a lowercased text"""
+        if self.word_boundary:
+            found = set(self.words.intersection(WORD.findall(text)))
+            if self.phrase_pattern is not None:
+                found.update(self.phrase_pattern.findall(text))
+            return found
+        
+        if self.word_pattern is None:
+            found = set()
+        elif self._scans():
+            found = {keyword for keyword in self.words if keyword in text}
+        else:
+            tokens = set(text.split())
+            tokens.difference_update(self.tokens_without_hits)
+            # Remembered hits are merged in C, not token by token, as dense texts have many
+            hits = list(map(self.token_hits.get, tokens))
+            if None in hits:
+                hits = [token_hits if token_hits is not None else self._match_token(token)
+                        for token, token_hits in zip(tokens, hits)]
+            found = set().union(*hits)
+        
+        found.update(phrase for phrase in self.phrases if phrase in text)
+        if self.labels:
+            self._record_hits(len(found) / len(self.labels))
+        return found
+    
+    def count(self, text):
+        """Count the distinct keywords of each label occurring in a lowercased text"""
+        if self.scores_per_label and not self.word_boundary and self._scans():
+            # Scores each label as it is scanned, without collecting the keywords found first
+            counts = Counter()
+            for label, keywords in self.groups.items():
+                score = sum(1 for keyword in keywords if keyword in text)
+                if score:
+                    counts[label] = score
+            if self.labels:
+                self._record_hits(sum(counts.values()) / len(self.labels))
+            return counts
+        
+        labels = self.labels
+        return Counter([label for keyword in self.find(text) for label in labels[keyword]])
\ No newline at end of file
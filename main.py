@@ -1,7 +1,8 @@
 import os
 import sys
 from datetime import datetime, timedelta
-from email_collector import EmailCollector
+from email_collector import EmailCollector, MultiAccountEmailCollector
+from mbox_collector import MboxCollector
 from github_collector import GitHubCollector
 from whatsapp_collector import WhatsAppCollector
 from report_generator import ReportGenerator
@@ -51,9 +52,16 @@ class ActivityReportGenerator:
         
         if email_enabled:
             try:
-                if 'gmail' in services:
+                if Config.EMAIL_ARCHIVE_PATH:
+                    self.email_collector = MboxCollector(Config.EMAIL_ARCHIVE_PATH)
+                    print(f"📧 Email collector initialized from archive ({len(self.email_collector.dates)} messages indexed)")
+                elif Config.EMAIL_ACCOUNTS:
+                    self.email_collector = MultiAccountEmailCollector()
+                    print(f"📧 Email collector initialized for {len(self.email_collector.collectors)} accounts")
+                elif 'gmail' in services:
                     self.email_collector = EmailCollector()
                     self.email_collector.service = services['gmail']  # Use authenticated service
+                    self.email_collector.credentials = self.oauth_manager.credentials_cache.get('gmail')
                     print("📧 Email collector initialized with OAuth")
                 else:
                     self.email_collector = EmailCollector()
@@ -90,15 +98,9 @@ class ActivityReportGenerator:
         if self.email_collector:
             print("📧 Collecting email data...")
             try:
-                sent_emails = self.email_collector.get_sent_emails(start_date, end_date)
-                received_emails = self.email_collector.get_received_emails(start_date, end_date)
-                categorized = self.email_collector.categorize_emails(sent_emails + received_emails)
-                
-                email_data = {
-                    'sent': sent_emails,
-                    'received': received_emails,
-                    'categorized': categorized
-                }
+                email_data = self.email_collector.collect(start_date, end_date)
+                sent_emails = email_data['sent']
+                received_emails = email_data['received']
                 
                 # AI Analysis for emails
                 print("🤖 Running AI analysis on email data...")
@@ -106,6 +108,9 @@ class ActivityReportGenerator:
                 
                 data['emails'] = email_data
                 print(f"✅ Found {len(sent_emails)} sent emails and {len(received_emails)} received emails")
+                if email_data.get('failed_accounts'):
+                    print(f"⚠️ Email data is incomplete, failed accounts: {', '.join(email_data['failed_accounts'])}")
+                self._print_request_stats('Gmail', self.email_collector)
                 print(f"🧠 AI identified {len(email_data['ai_analysis']['key_topics'])} key topics")
             except Exception as e:
                 print(f"❌ Error collecting email data: {e}")
@@ -126,6 +131,9 @@ class ActivityReportGenerator:
                 
                 data['github'] = github_data
                 print(f"✅ Found {github_stats['total_commits']} commits and {github_stats['total_prs']} pull requests")
+                if github_data.get('failed_repos'):
+                    print(f"⚠️ GitHub data is incomplete, failed repositories: {', '.join(github_data['failed_repos'])}")
+                self._print_request_stats('GitHub', self.github_collector)
                 print(f"🧠 AI productivity score: {github_data['ai_analysis']['productivity_score']}%")
             except Exception as e:
                 print(f"❌ Error collecting GitHub data: {e}")
@@ -159,6 +167,16 @@ class ActivityReportGenerator:
         
         return data
     
+    def _print_request_stats(self, service, collector):
+        """Print API request counters of a collector"""
+        if not hasattr(collector, 'get_request_stats'):
+            return
+        stats = collector.get_request_stats()
+        print(f"🔁 {service} API: {stats['requests']} requests, {stats['retries']} retries, "
+              f"{stats['throttled_seconds']}s throttled")
+        if 'cache_hits' in stats:
+            print(f"💾 {service} cache: {stats['cache_hits']} responses revalidated without using quota")
+    
     def generate_report(self, start_date, end_date, output_format='both'):
         """Generate activity report"""
         print(f"\nGenerating report for period: {start_date.strftime('%Y-%m-%d')} to {end_date.strftime('%Y-%m-%d')}")
@@ -0,0 +1,324 @@
+import os
+import re
+import mmap
+import heapq
+import pickle
+from array import array
+from bisect import bisect_left
+from itertools import repeat
+from datetime import datetime, timedelta
+from email.parser import BytesHeaderParser, BytesParser
+from email.policy import default as default_policy
+from email.utils import parsedate_to_datetime, parseaddr
+from email_collector import EmailCollector
+from config import Config
+
+# Bumped whenever the on-disk index layout changes
+INDEX_VERSION = 1
+DATE_HEADER = re.compile(rb'^Date:[ \t]*(.*(?:\r?\n[ \t].*)*)', re.MULTILINE | re.IGNORECASE)
+ESCAPED_FROM = re.compile(rb'\n>(>*From )')
+GMAIL_LABELS = {'sent': 'SENT', 'inbox': 'INBOX'}
+
+class LazyMessage(dict):
+    """Parsed message dict that only decodes its body when it is first read"""
+    
+    def __init__(self, loader, fields):
+        super().__init__(fields)
+        self._loader = loader
+    
+    def _load_body(self):
+        if self._loader is not None:
+            loader, self._loader = self._loader, None
+            self['body'] = loader()
+    
+    def __missing__(self, key):
+        if key == 'body' and self._loader is not None:
+            self._load_body()
+            return dict.__getitem__(self, key)
+        raise KeyError(key)
+    
+    def __contains__(self, key):
+        return (key == 'body' and self._loader is not None) or dict.__contains__(self, key)
+    
+    def get(self, key, default=None):
+        if key == 'body':
+            self._load_body()
+        return dict.get(self, key, default)
+
+class MboxCollector:
+    """Offline email source for mbox archives (e.g. Google Takeout) and .eml folders"""
+    
+    def __init__(self, archive_path=None, accounts=None, body_analysis=None):
+        self.archive_path = archive_path or Config.EMAIL_ARCHIVE_PATH
+        self.accounts = {account.lower() for account in (accounts or Config.EMAIL_ACCOUNTS)}
+        # Bodies are only decoded when body-based analysis needs them
+        self.body_analysis = Config.EMAIL_BODY_ANALYSIS if body_analysis is None else body_analysis
+        self.header_parser = BytesHeaderParser(policy=default_policy)
+        self.sources = []
+        self._maps = {}
+        
+        # Combined index of every message, sorted by date
+        self.dates = array('d')
+        self.source_ids = array('I')
+        self.starts = array('q')
+        self.ends = array('q')
+        self._build_index()
+    
+    def _build_index(self):
+        """Index all archives, reusing saved mbox indexes when files are unchanged"""
+        streams = []
+        eml_entries = []
+        
+        for path in self._find_sources():
+            source_id = len(self.sources)
+            self.sources.append(path)
+            
+            if path.lower().endswith('.eml'):
+                eml_entries.append((self._read_eml_date(path), source_id, 0, os.path.getsize(path)))
+            else:
+                dates, starts, ends = self._load_mbox_index(path)
+                streams.append(zip(dates, repeat(source_id), starts, ends))
+        
+        eml_entries.sort()
+        streams.append(eml_entries)
+        
+        # Each mbox index is already sorted by date, so merging keeps memory flat
+        for date, source_id, start, end in heapq.merge(*streams):
+            self.dates.append(date)
+            self.source_ids.append(source_id)
+            self.starts.append(start)
+            self.ends.append(end)
+    
+    def _find_sources(self):
+        """List mbox and .eml files under the archive path"""
+        if not self.archive_path or not os.path.exists(self.archive_path):
+            return []
+        if os.path.isfile(self.archive_path):
+            return [self.archive_path]
+        
+        sources = []
+        for root, _, files in os.walk(self.archive_path):
+            for file in sorted(files):
+                if file.lower().endswith(('.mbox', '.eml')):
+                    sources.append(os.path.join(root, file))
+        return sources
+    
+    def _get_map(self, path):
+        """Get a read-only memory map of an archive file"""
+        if path not in self._maps:
+            with open(path, 'rb') as file:
+                self._maps[path] = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        return self._maps[path]
+    
+    def _load_mbox_index(self, path):
+        """Load the byte-offset index of an mbox file, rebuilding it when stale"""
+        index_path = path + '.idx'
+        stat = os.stat(path)
+        
+        try:
+            with open(index_path, 'rb') as file:
+                saved = pickle.load(file)
+            if (saved['version'], saved['size'], saved['mtime']) == (INDEX_VERSION, stat.st_size, stat.st_mtime):
+                return saved['dates'], saved['starts'], saved['ends']
+        except (OSError, pickle.UnpicklingError, EOFError, KeyError):
+            pass
+        
+        dates, starts, ends = self._scan_mbox(path)
+        
+        try:
+            with open(index_path, 'wb') as file:
+                pickle.dump({
+                    'version': INDEX_VERSION,
+                    'size': stat.st_size,
+                    'mtime': stat.st_mtime,
+                    'dates': dates,
+                    'starts': starts,
+                    'ends': ends
+                }, file)
+        except OSError as e:
+            print(f"Could not save mbox index {index_path}: {e}")
+        
+        return dates, starts, ends
+    
+    def _scan_mbox(self, path):
+        """Find message boundaries and dates in an mbox file, sorted by date"""
+        dates = array('d')
+        starts = array('q')
+        ends = array('q')
+        
+        if os.path.getsize(path) == 0:
+            return dates, starts, ends
+        
+        data = self._get_map(path)
+        size = len(data)
+        if data[:5] == b'From ':
+            start = 0
+        else:
+            start = data.find(b'\nFrom ')
+            if start == -1:
+                return dates, starts, ends
+            start += 1
+        
+        while start < size:
+            next_start = data.find(b'\nFrom ', start)
+            end = next_start + 1 if next_start != -1 else size
+            
+            header_start, header_end = self._header_bounds(data, start, end)
+            dates.append(self._parse_date(data[header_start:header_end]))
+            starts.append(start)
+            ends.append(end)
+            start = end
+        
+        # Takeout archives are not in date order
+        order = sorted(range(len(dates)), key=dates.__getitem__)
+        return (
+            array('d', (dates[i] for i in order)),
+            array('q', (starts[i] for i in order)),
+            array('q', (ends[i] for i in order))
+        )
+    
+    @staticmethod
+    def _header_bounds(data, start, end):
+        """Get the header block of a message, skipping the mbox 'From ' line"""
+        header_start = start
+        if data[start:start + 5] == b'From ':
+            header_start = data.find(b'\n', start, end) + 1 or end
+        
+        candidates = [pos for pos in (data.find(b'\n\n', header_start, end), data.find(b'\n\r\n', header_start, end)) if pos != -1]
+        header_end = min(candidates) + 1 if candidates else end
+        return header_start, header_end
+    
+    def _read_eml_date(self, path):
+        """Read the date of an .eml file from its headers only"""
+        with open(path, 'rb') as file:
+            headers = b''
+            for line in file:
+                if line in (b'\n', b'\r\n'):
+                    break
+                headers += line
+        return self._parse_date(headers)
+    
+    @staticmethod
+    def _parse_date(headers):
+        """Get the Date header of a raw header block as epoch seconds"""
+        match = DATE_HEADER.search(headers)
+        if not match:
+            return 0.0
+        try:
+            return parsedate_to_datetime(match.group(1).decode('ascii', 'ignore').strip()).timestamp()
+        except (TypeError, ValueError):
+            return 0.0
+    
+    def _read(self, position):
+        """Get the raw bytes of an indexed message"""
+        path = self.sources[self.source_ids[position]]
+        if path.lower().endswith('.eml'):
+            with open(path, 'rb') as file:
+                return file.read()
+        return self._get_map(path)[self.starts[position]:self.ends[position]]
+    
+    def _read_headers(self, position):
+        """Get the raw header block of an indexed message"""
+        path = self.sources[self.source_ids[position]]
+        if path.lower().endswith('.eml'):
+            data = self._read(position)
+            start, end = 0, len(data)
+        else:
+            data = self._get_map(path)
+            start, end = self.starts[position], self.ends[position]
+        
+        header_start, header_end = self._header_bounds(data, start, end)
+        return data[header_start:header_end]
+    
+    def iter_messages(self, start_date, end_date, query=''):
+        """Yield messages within date range, parsing headers only"""
+        start = datetime(start_date.year, start_date.month, start_date.day).timestamp()
+        end = (datetime(end_date.year, end_date.month, end_date.day) + timedelta(days=1)).timestamp()
+        label = {'in:sent': 'SENT', 'in:inbox': 'INBOX'}.get(query)
+        
+        # Jump straight to the period using the date-sorted index
+        position = bisect_left(self.dates, start)
+        while position < len(self.dates) and self.dates[position] < end:
+            message = self.parse_message(position)
+            if label is None or label in message['labelIds']:
+                yield message
+            position += 1
+    
+    def parse_message(self, position):
+        """Parse an indexed message into the same dict EmailCollector.parse_message produces"""
+        path = self.sources[self.source_ids[position]]
+        headers = self.header_parser.parsebytes(self._read_headers(position))
+        
+        message_id = str(headers.get('Message-ID', '') or '')
+        msg_info = {
+            'id': str(headers.get('X-GM-MSGID', '') or '') or message_id or f'{path}:{self.starts[position]}',
+            'threadId': str(headers.get('X-GM-THRID', '') or ''),
+            'message_id': message_id,
+            'internalDate': int(self.dates[position] * 1000),
+            'labelIds': self._get_labels(headers)
+        }
+        
+        for name in ['from', 'to', 'subject', 'date']:
+            if headers.get(name) is not None:
+                msg_info[name] = str(headers[name])
+        
+        msg_info['datetime'] = datetime.fromtimestamp(self.dates[position]) if self.dates[position] else None
+        
+        # Every collected message reaches the classifiers, which read the body, so headers-only
+        # runs get an empty one as EmailCollector's metadata fetches do
+        if not self.body_analysis:
+            msg_info['body'] = ''
+            return LazyMessage(None, msg_info)
+        return LazyMessage(lambda: self._get_body(position), msg_info)
+    
+    def _get_labels(self, headers):
+        """Map Takeout labels, or the sender address, to Gmail label ids"""
+        labels = []
+        for label in str(headers.get('X-Gmail-Labels', '') or '').split(','):
+            label = label.strip().lower()
+            if label in GMAIL_LABELS:
+                labels.append(GMAIL_LABELS[label])
+        
+        if not labels:
+            sender = parseaddr(str(headers.get('From', '') or ''))[1].lower()
+            labels.append('SENT' if sender in self.accounts else 'INBOX')
+        return labels
+    
+    def _get_body(self, position):
+        """Decode the text/plain body of an indexed message"""
+        raw = ESCAPED_FROM.sub(rb'\n\1', self._read(position))
+        if raw[:5] == b'From ':
+            raw = raw[raw.find(b'\n') + 1:]
+        
+        message = BytesParser(policy=default_policy).parsebytes(raw)
+        body = ''
+        for part in message.walk():
+            if part.get_content_type() == 'text/plain' and not part.is_attachment():
+                try:
+                    body += part.get_content()
+                except (LookupError, UnicodeDecodeError):
+                    body += part.get_payload(decode=True).decode('utf-8', errors='ignore')
+        return body
+    
+    def get_messages(self, start_date, end_date, query=''):
+        """Get messages within date range"""
+        # Errors propagate, so an unreadable archive is never an empty report
+        return list(self.iter_messages(start_date, end_date, query))
+    
+    def get_sent_emails(self, start_date, end_date):
+        """Get sent emails within date range"""
+        return self.get_messages(start_date, end_date, 'in:sent')
+    
+    def get_received_emails(self, start_date, end_date):
+        """Get received emails within date range"""
+        return self.get_messages(start_date, end_date, 'in:inbox')
+    
+    def collect(self, start_date, end_date):
+        """Collect sent and received emails for a period in one pass over the index"""
+        return EmailCollector.group_messages(self.iter_messages(start_date, end_date))
+    
+    def close(self):
+        """Release memory maps"""
+        for data in self._maps.values():
+            data.close()
+        self._maps.clear()
\ No newline at end of file
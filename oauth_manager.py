@@ -8,6 +8,8 @@ from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import InstalledAppFlow
 from googleapiclient.discovery import build
 from github import Github
+from config import Config
+from http_cache import install_github_cache
 import threading
 import time
 
@@ -65,7 +67,10 @@ class OAuthManager:
                 raise ValueError("GitHub token not provided. Please set GITHUB_TOKEN environment variable or provide token parameter.")
         
         try:
-            self.github_client = Github(token)
+            if Config.GITHUB_HTTP_CACHE:
+                install_github_cache(Config.GITHUB_HTTP_CACHE, int(Config.GITHUB_HTTP_CACHE_MAX_MB * 1024 * 1024))
+            # Paced and retried by the collector's RequestScheduler instead of PyGithub
+            self.github_client = Github(token, retry=None, seconds_between_requests=None)
             # Test the connection
             user = self.github_client.get_user()
             print(f"Connected to GitHub as: {user.login}")
@@ -0,0 +1,34 @@
+import time
+import threading
+
+class TokenBucket:
+    """Thread-safe token bucket used to pace API requests"""
+    
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = capacity or max(rate, 1)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+    
+    def acquire(self, tokens=1):
+        """Block until tokens are available, returning the seconds spent waiting"""
+        if self.rate <= 0:
+            return 0
+        
+        tokens = min(tokens, self.capacity)
+        waited = 0
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                
+                if self.tokens >= tokens:
+                    self.tokens -= tokens
+                    return waited
+                
+                delay = (tokens - self.tokens) / self.rate
+            
+            time.sleep(delay)
+            waited += delay
\ No newline at end of file
@@ -7,6 +7,7 @@ from docx import Document
 from docx.shared import Pt, RGBColor, Inches
 from docx.enum.text import WD_ALIGN_PARAGRAPH
 from config import Config
+from email_features import extract_features
 
 class ReportGenerator:
     def __init__(self):
@@ -303,16 +304,4 @@ class ReportGenerator:
     
     def _categorize_email(self, email):
         """Categorize email based on content"""
-        subject = email.get('subject', '').lower()
-        body = email.get('body', '').lower()
-        
-        if any(word in subject + body for word in ['soporte', 'ticket', 'problema']):
-            return 'Soporte'
-        elif any(word in subject + body for word in ['desarrollo', 'código', 'github']):
-            return 'Desarrollo'
-        elif any(word in subject + body for word in ['reunión', 'meeting']):
-            return 'Reunión'
-        elif any(word in subject + body for word in ['reporte', 'informe']):
-            return 'Reporte'
-        else:
-            return 'General'
\ No newline at end of file
+        return extract_features(email).report_category
\ No newline at end of file
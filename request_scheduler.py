@@ -0,0 +1,144 @@
+import time
+import random
+import threading
+from rate_limiter import TokenBucket
+from config import Config
+
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+
+class RequestScheduler:
+    """Paces API requests and retries rate-limited or failed ones with backoff"""
+    
+    def __init__(self, name, requests_per_second, burst=None, max_retries=None,
+                 base_delay=1.0, max_delay=60.0, quota=None):
+        self.name = name
+        self.bucket = TokenBucket(requests_per_second, burst)
+        self.max_retries = Config.API_MAX_RETRIES if max_retries is None else max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        # Optional callable returning (remaining, reset_epoch) for the current quota
+        self.quota = quota
+        self.lock = threading.Lock()
+        self.blocked_until = 0
+        self.stats = {
+            'requests': 0,
+            'retries': 0,
+            'failures': 0,
+            'throttled_seconds': 0.0
+        }
+    
+    def call(self, func, *args, cost=1, **kwargs):
+        """Run an API call, pacing it and retrying it on retryable errors"""
+        attempt = 0
+        while True:
+            self.wait(cost)
+            try:
+                return func(*args, **kwargs)
+            except Exception as e:
+                delay = self.retry_delay(e, attempt)
+                if delay is None or attempt >= self.max_retries:
+                    self.count('failures')
+                    raise
+                
+                attempt += 1
+                self.count('retries')
+                self.sleep(delay)
+    
+    def wait(self, cost=1):
+        """Block until the quota and the token bucket allow another request"""
+        self.observe_quota()
+        
+        delay = self.blocked_until - time.time()
+        if delay > 0:
+            self.sleep(delay)
+        
+        waited = self.bucket.acquire(cost)
+        with self.lock:
+            self.stats['requests'] += cost
+            self.stats['throttled_seconds'] += waited
+    
+    def sleep(self, seconds):
+        """Sleep, counting the time as throttled"""
+        time.sleep(seconds)
+        with self.lock:
+            self.stats['throttled_seconds'] += seconds
+    
+    def backoff(self, attempt):
+        """Jittered exponential backoff delay for a retry attempt"""
+        delay = min(self.max_delay, self.base_delay * 2 ** attempt)
+        return delay / 2 + random.uniform(0, delay / 2)
+    
+    def observe_quota(self):
+        """Pause until the quota resets when the remaining quota is used up"""
+        if not self.quota:
+            return
+        try:
+            remaining, reset = self.quota()
+        except Exception:
+            return
+        if remaining is not None and remaining <= 0 and reset:
+            self.block_until(float(reset))
+    
+    def observe_headers(self, headers):
+        """Follow X-RateLimit-Remaining/Reset headers of a response"""
+        headers = {str(key).lower(): value for key, value in (headers or {}).items()}
+        if headers.get('x-ratelimit-remaining') == '0' and headers.get('x-ratelimit-reset'):
+            self.block_until(float(headers['x-ratelimit-reset']))
+    
+    def block_until(self, timestamp):
+        """Hold every request until the given epoch time"""
+        with self.lock:
+            self.blocked_until = max(self.blocked_until, min(timestamp, time.time() + 3600))
+    
+    def retry_delay(self, error, attempt):
+        """Get how long to wait before retrying an error, or None if it is not retryable"""
+        status, headers = self._error_details(error)
+        
+        if 'retry-after' in headers:
+            try:
+                return min(float(headers['retry-after']), self.max_delay * 10)
+            except ValueError:
+                pass
+        
+        if headers.get('x-ratelimit-remaining') == '0' and headers.get('x-ratelimit-reset'):
+            self.observe_headers(headers)
+            return max(self.blocked_until - time.time(), 0) + self.backoff(0)
+        
+        message = str(error).lower()
+        if status in RETRYABLE_STATUSES or (status == 403 and ('rate limit' in message or 'ratelimit' in message)):
+            return self.backoff(attempt)
+        
+        if status is None and isinstance(error, (ConnectionError, TimeoutError)):
+            return self.backoff(attempt)
+        
+        return None
+    
+    @staticmethod
+    def _error_details(error):
+        """Get the HTTP status and lowercased headers of a Gmail/GitHub/requests error"""
+        # googleapiclient HttpError keeps the response (a dict of headers) in resp
+        resp = getattr(error, 'resp', None)
+        if resp is not None and hasattr(resp, 'status'):
+            return resp.status, {str(k).lower(): v for k, v in dict(resp).items()}
+        
+        # requests.HTTPError
+        response = getattr(error, 'response', None)
+        if response is not None and hasattr(response, 'status_code'):
+            return response.status_code, {str(k).lower(): v for k, v in response.headers.items()}
+        
+        # PyGithub GithubException
+        status = getattr(error, 'status', None)
+        headers = getattr(error, 'headers', None) or {}
+        return status, {str(k).lower(): v for k, v in headers.items()}
+    
+    def count(self, key, amount=1):
+        """Add to one of the counters"""
+        with self.lock:
+            self.stats[key] += amount
+    
+    def get_stats(self):
+        """Get request, retry and throttling counters"""
+        with self.lock:
+            stats = dict(self.stats)
+        stats['throttled_seconds'] = round(stats['throttled_seconds'], 2)
+        return stats
\ No newline at end of file
@@ -0,0 +1,114 @@
+import os
+import json
+import pickle
+import hashlib
+
+# Bumped whenever the cached column layout changes
+CACHE_VERSION = 3
+MANIFEST_FILE = 'manifest.json'
+
+class ExportCache:
+    """On-disk cache of parsed WhatsApp exports, keyed by path, size and mtime (or content hash)"""
+    
+    def __init__(self, cache_dir, use_hash=False):
+        self.cache_dir = cache_dir
+        self.use_hash = use_hash
+        os.makedirs(cache_dir, exist_ok=True)
+    
+    def _entry_path(self, file_path):
+        name = hashlib.sha1(os.path.abspath(file_path).encode('utf-8')).hexdigest()
+        return os.path.join(self.cache_dir, name + '.pkl')
+    
+    @staticmethod
+    def file_hash(file_path, size=None):
+        """Hash the content of an export file, or of its first size bytes"""
+        digest = hashlib.sha256()
+        remaining = os.path.getsize(file_path) if size is None else size
+        with open(file_path, 'rb') as file:
+            while remaining > 0:
+                chunk = file.read(min(1 << 20, remaining))
+                if not chunk:
+                    break
+                digest.update(chunk)
+                remaining -= len(chunk)
+        return digest.hexdigest()
+    
+    def lookup(self, file_path, incremental=False):
+        """Get (columns, parsed bytes) of a cached export, or (None, 0) when it must be parsed again"""
+        # Parsed bytes short of the file size mean only the tail past that offset needs parsing
+        stat = os.stat(file_path)
+        entry_path = self._entry_path(file_path)
+        try:
+            with open(entry_path, 'rb') as file:
+                entry = pickle.load(file)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            return None, 0
+        
+        if entry.get('version') != CACHE_VERSION:
+            return None, 0
+        if entry['size'] == stat.st_size and entry['mtime'] == stat.st_mtime:
+            return entry['columns'], entry['size']
+        if not entry.get('hash'):
+            return None, 0
+        
+        # A touched but identical file (e.g. exported again) still hits when hashing is on
+        if self.use_hash and entry['size'] == stat.st_size and entry['hash'] == self.file_hash(file_path):
+            entry['mtime'] = stat.st_mtime
+            self._write(entry_path, entry)
+            return entry['columns'], entry['size']
+        
+        # A re-export that only appended messages keeps the cached prefix byte for byte
+        if incremental and entry['size'] < stat.st_size and entry['hash'] == self.file_hash(file_path, entry['size']):
+            return entry['columns'], entry['size']
+        return None, 0
+    
+    def save(self, file_path, columns, size):
+        """Store the parsed columns of the first size bytes of an export"""
+        stat = os.stat(file_path)
+        self._write(self._entry_path(file_path), {
+            'version': CACHE_VERSION,
+            'path': os.path.abspath(file_path),
+            'size': size,
+            'mtime': stat.st_mtime,
+            'hash': self.file_hash(file_path, size) if self.use_hash else None,
+            'columns': columns
+        })
+    
+    def _write(self, entry_path, entry):
+        # Write then rename, so parallel readers never see a partial entry
+        temp_path = f'{entry_path}.{os.getpid()}.tmp'
+        try:
+            with open(temp_path, 'wb') as file:
+                pickle.dump(entry, file, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temp_path, entry_path)
+        except OSError as e:
+            print(f"Could not save WhatsApp parse cache {entry_path}: {e}")
+    
+    def evict(self, file_paths):
+        """Record the current exports and drop entries whose export no longer exists"""
+        manifest_path = os.path.join(self.cache_dir, MANIFEST_FILE)
+        try:
+            with open(manifest_path, 'r', encoding='utf-8') as file:
+                manifest = json.load(file)
+        except (OSError, ValueError):
+            manifest = {}
+        
+        for file_path in file_paths:
+            manifest[os.path.basename(self._entry_path(file_path))] = os.path.abspath(file_path)
+        
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith('.pkl'):
+                continue
+            source = manifest.get(name)
+            if source is None or not os.path.exists(source):
+                try:
+                    os.remove(os.path.join(self.cache_dir, name))
+                except OSError:
+                    pass
+                manifest.pop(name, None)
+        
+        try:
+            with open(manifest_path, 'w', encoding='utf-8') as file:
+                json.dump(manifest, file)
+        except OSError as e:
+            print(f"Could not save WhatsApp parse cache manifest: {e}")
\ No newline at end of file
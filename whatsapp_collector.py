@@ -1,53 +1,109 @@
 import re
 import os
+from array import array
+from bisect import bisect_left, bisect_right
+from itertools import islice, repeat
 from datetime import datetime
 from typing import List, Dict
+from concurrent.futures import ProcessPoolExecutor
 import pandas as pd
+from config import Config
+from whatsapp_cache import ExportCache
+from whatsapp_store import MessageStore, MessageSlice, to_seconds
+
+# Format: [DD/MM/YYYY, HH:MM:SS] Contact: Message
+MESSAGE_HEADER = re.compile(r'\[(\d{1,2})/(\d{1,2})/(\d{4}),?\s+(\d{1,2}):(\d{2}):(\d{2})\]\s+([^:]+):\s+(.*)')
+TIMESTAMP_PREFIX = re.compile(r'\[(\d{1,2})/(\d{1,2})/\d{4},?\s+\d{1,2}:\d{2}:\d{2}\]')
+# Leading lines inspected to tell DD/MM from MM/DD exports
+DATE_ORDER_SAMPLE = 5000
+# Silence after which a customer's next message starts a new conversation
+CONVERSATION_GAP_SECONDS = 2 * 60 * 60
 
 class WhatsAppCollector:
     def __init__(self, export_path=None):
         self.export_path = export_path
         self.messages = []
+        # Time-indexed store of every exported message, reused across report periods
+        self.store = None
+        self._store_signature = None
+        # Byte offset where the last export parse cleanly reached EOF, None if it failed
+        self.parsed_offset = None
     
     def parse_whatsapp_export(self, file_path):
         """Parse WhatsApp chat export file"""
-        messages = []
-        
-        # Pattern for WhatsApp messages
-        # Format: [DD/MM/YYYY, HH:MM:SS] Contact: Message
-        pattern = r'\[(\d{1,2}/\d{1,2}/\d{4}),?\s+(\d{1,2}:\d{2}:\d{2})\]\s+([^:]+):\s+(.*)'
+        return list(self.iter_whatsapp_export(file_path))
+    
+    def iter_whatsapp_export(self, file_path, offset=0):
+        """Yield messages of a WhatsApp chat export one at a time, joining multi-line messages"""
+        current = None
+        self.parsed_offset = None
         
         try:
-            with open(file_path, 'r', encoding='utf-8') as file:
-                content = file.read()
-                
-            # Find all messages
-            matches = re.findall(pattern, content)
-            
-            for match in matches:
-                date_str, time_str, sender, message = match
-                
-                # Parse datetime
-                datetime_str = f"{date_str} {time_str}"
-                try:
-                    msg_datetime = datetime.strptime(datetime_str, "%d/%m/%Y %H:%M:%S")
-                except:
-                    try:
-                        msg_datetime = datetime.strptime(datetime_str, "%m/%d/%Y %H:%M:%S")
-                    except:
-                        continue
-                
-                messages.append({
-                    'datetime': msg_datetime,
-                    'sender': sender.strip(),
-                    'message': message.strip(),
-                    'is_customer': not self._is_saved_contact(sender.strip())
-                })
-                
+            # Binary lines keep byte offsets exact, so a grown export can resume at its old end
+            with open(file_path, 'rb') as file:
+                day_first = self._detect_day_first(file)
+                file.seek(offset)
+                for line in file:
+                    # Some exports prefix lines with a left-to-right mark
+                    line = line.decode('utf-8', errors='replace').rstrip('\r\n').lstrip('\u200e')
+                    match = MESSAGE_HEADER.match(line)
+                    if match:
+                        if current:
+                            yield self._finish_message(current)
+                        current = self._build_message(match.groups(), day_first)
+                    elif TIMESTAMP_PREFIX.match(line):
+                        # System notices (encryption, joins, ...) end the previous message
+                        if current:
+                            yield self._finish_message(current)
+                        current = None
+                    elif current is not None:
+                        current['message'] += '\n' + line
+                self.parsed_offset = file.tell()
         except Exception as e:
             print(f"Error parsing WhatsApp export: {e}")
         
-        return messages
+        if current:
+            yield self._finish_message(current)
+    
+    @staticmethod
+    def _detect_day_first(file):
+        """Detect once per file whether dates are DD/MM (the default) or MM/DD from a sample of headers"""
+        file.seek(0)
+        for line in islice(file, DATE_ORDER_SAMPLE):
+            match = TIMESTAMP_PREFIX.match(line.decode('utf-8', errors='replace').lstrip('\u200e'))
+            if not match:
+                continue
+            if int(match.group(1)) > 12:
+                return True
+            if int(match.group(2)) > 12:
+                return False
+        return True
+    
+    def _build_message(self, groups, day_first):
+        """Build a message record from header groups, or None if its date cannot be parsed"""
+        first, other, year, hour, minute, second, sender, message = groups
+        day, month = (first, other) if day_first else (other, first)
+        try:
+            msg_datetime = datetime(int(year), int(month), int(day), int(hour), int(minute), int(second))
+        except ValueError:
+            # Dates that do not fit the detected order are tried the other way around
+            try:
+                msg_datetime = datetime(int(year), int(day), int(month), int(hour), int(minute), int(second))
+            except ValueError:
+                return None
+        
+        return {
+            'datetime': msg_datetime,
+            'sender': sender.strip(),
+            'message': message.strip(),
+            'is_customer': not self._is_saved_contact(sender.strip())
+        }
+    
+    @staticmethod
+    def _finish_message(message):
+        """Trim trailing blank continuation lines"""
+        message['message'] = message['message'].rstrip()
+        return message
     
     def _is_saved_contact(self, sender):
         """Check if sender is a saved contact (not a phone number)"""
@@ -67,24 +123,36 @@ class WhatsAppCollector:
     
     def analyze_customer_support(self, messages):
         """Analyze customer support activities"""
+        # Conversations reference ranges of one columnar store instead of copying message dicts
+        if not isinstance(messages, MessageSlice):
+            messages = MessageStore.from_messages(messages).select()
+        
         analysis = {
-            'total_messages': len(messages),
-            'unique_customers': len(set(m['sender'] for m in messages if m['is_customer'])),
+            'total_messages': messages.customer_count(),
+            'unique_customers': len(messages.customers()),
             'conversations': [],
             'common_topics': {},
-            'response_times': []
+            'response_times': {}
         }
         
         # Group messages by conversation
-        conversations = self._group_conversations(messages)
+        conversations = messages.conversations(CONVERSATION_GAP_SECONDS)
+        analysis['response_times'], averages, counts = conversations.response_times(Config.WHATSAPP_SLA_MINUTES)
         
-        for conv in conversations:
+        for i in range(len(conversations)):
+            conv_messages = conversations.messages(i)
             conv_data = {
-                'customer': conv['customer'],
-                'start_time': conv['messages'][0]['datetime'],
-                'end_time': conv['messages'][-1]['datetime'],
-                'message_count': len(conv['messages']),
-                'topics': self._extract_topics(conv['messages'])
+                'customer': conversations.customer(i),
+                'chat': conversations.chat(i),
+                'start_time': conv_messages[0]['datetime'],
+                'end_time': conv_messages[-1]['datetime'],
+                'message_count': len(conv_messages),
+                'topics': self._extract_topics(conv_messages.customer_messages()),
+                'messages': conv_messages,
+                'response_time': {
+                    'average_response_time': float(averages[i]) / 60,
+                    'response_count': int(counts[i])
+                }
             }
             analysis['conversations'].append(conv_data)
         
@@ -98,32 +166,6 @@ class WhatsAppCollector:
         
         return analysis
     
-    def _group_conversations(self, messages):
-        """Group messages into conversations"""
-        conversations = []
-        current_conv = None
-        
-        for msg in sorted(messages, key=lambda x: x['datetime']):
-            # Start new conversation if it's a different customer or > 2 hours gap
-            if current_conv is None or \
-               msg['sender'] != current_conv['customer'] or \
-               (msg['datetime'] - current_conv['messages'][-1]['datetime']).seconds > 7200:
-                
-                if current_conv:
-                    conversations.append(current_conv)
-                
-                current_conv = {
-                    'customer': msg['sender'],
-                    'messages': [msg]
-                }
-            else:
-                current_conv['messages'].append(msg)
-        
-        if current_conv:
-            conversations.append(current_conv)
-        
-        return conversations
-    
     def _extract_topics(self, messages):
         """Extract topics from messages"""
         topics = []
@@ -148,28 +190,129 @@ class WhatsAppCollector:
         
         return topics if topics else ['general_inquiry']
     
-    def get_statistics(self, start_date, end_date):
-        """Get WhatsApp statistics for the period"""
-        all_messages = []
-        
-        # Load all WhatsApp exports
-        if self.export_path and os.path.exists(self.export_path):
-            if os.path.isfile(self.export_path):
-                all_messages = self.parse_whatsapp_export(self.export_path)
-            elif os.path.isdir(self.export_path):
-                for file in os.listdir(self.export_path):
-                    if file.endswith('.txt'):
-                        file_path = os.path.join(self.export_path, file)
-                        all_messages.extend(self.parse_whatsapp_export(file_path))
-        
-        # Filter messages by date
-        period_messages = [
-            m for m in all_messages 
-            if start_date <= m['datetime'] <= end_date
+    def _find_exports(self):
+        """List the export files under the export path"""
+        if not self.export_path or not os.path.exists(self.export_path):
+            return []
+        if os.path.isfile(self.export_path):
+            return [self.export_path]
+        return [
+            os.path.join(self.export_path, file)
+            for file in sorted(os.listdir(self.export_path)) if file.endswith('.txt')
         ]
+    
+    def get_store(self):
+        """Get the time-indexed store of all exported messages, rebuilding it when an export changes"""
+        export_files = self._find_exports()
+        signature = []
+        for file_path in export_files:
+            stat = os.stat(file_path)
+            signature.append((file_path, stat.st_size, stat.st_mtime))
         
-        # Get customer interactions
-        customer_messages = self.get_customer_interactions(period_messages, start_date, end_date)
+        if self.store is None or signature != self._store_signature:
+            chats = [os.path.splitext(os.path.basename(file_path))[0] for file_path in export_files]
+            self.store = MessageStore(self._parse_exports(export_files, datetime.min, datetime.max), chats)
+            self._store_signature = signature
+            
+            if Config.WHATSAPP_CACHE_DIR:
+                ExportCache(Config.WHATSAPP_CACHE_DIR).evict(export_files)
+        return self.store
+    
+    def get_customer_messages(self, customer, start_date=None, end_date=None):
+        """Get one customer's messages within date range from the per-sender index"""
+        return self.get_store().get_sender_messages(customer, start_date, end_date)
+    
+    def load_messages(self, start_date, end_date):
+        """Get the period's messages from all exports in timestamp order"""
+        return self.get_store().get_messages(start_date, end_date)
+    
+    def _parse_exports(self, export_files, start_date, end_date):
+        """Parse export files over a process pool sized to the CPU count"""
+        options = (Config.WHATSAPP_CACHE_DIR, Config.WHATSAPP_CACHE_HASH, Config.WHATSAPP_INCREMENTAL)
+        workers = min(Config.WHATSAPP_MAX_WORKERS or os.cpu_count() or 1, len(export_files))
+        if workers > 1:
+            try:
+                with ProcessPoolExecutor(max_workers=workers) as executor:
+                    chunksize = max(1, len(export_files) // (workers * 4))
+                    return list(executor.map(
+                        _parse_export_file, export_files, repeat(start_date), repeat(end_date), repeat(options),
+                        chunksize=chunksize
+                    ))
+            except Exception as e:
+                print(f"Parallel WhatsApp parsing failed, parsing serially: {e}")
+        
+        return [_parse_export_file(file_path, start_date, end_date, options) for file_path in export_files]
+    
+    def get_statistics(self, start_date, end_date):
+        """Get WhatsApp statistics for the period"""
+        # Customer messages plus agent replies, so conversations capture response times
+        period_messages = self.get_store().select(start_date, end_date)
         
         # Analyze support activities
-        return self.analyze_customer_support(customer_messages)
\ No newline at end of file
+        return self.analyze_customer_support(period_messages)
+
+def _parse_export_file(file_path, start_date, end_date, options=(None, False, False)):
+    """Parse one export (in a worker process), via the parse cache, into the period's message columns"""
+    cache_dir, use_hash, incremental = options
+    cache = ExportCache(cache_dir, use_hash or incremental) if cache_dir else None
+    
+    columns, offset = cache.lookup(file_path, incremental) if cache else (None, 0)
+    if columns is None or offset < os.path.getsize(file_path):
+        # Only the tail past the cached prefix is parsed when an export has grown
+        collector = WhatsAppCollector()
+        columns = _build_columns(collector.iter_whatsapp_export(file_path, offset), columns)
+        # A parse cut short by an I/O error must not be cached as the complete file
+        if cache and collector.parsed_offset is not None:
+            cache.save(file_path, columns, collector.parsed_offset)
+    return _slice_columns(columns, start_date, end_date)
+
+def _build_columns(messages, columns=None):
+    """Store messages as time-sorted columns: seconds, sender ids and texts, plus per-sender flags"""
+    if columns is None:
+        columns = {'seconds': array('q'), 'sender_ids': array('I'), 'messages': [], 'senders': [], 'customers': b''}
+    seconds = columns['seconds']
+    last_seconds = seconds[-1] if seconds else None
+    in_order = True
+    sender_ids = {sender: i for i, sender in enumerate(columns['senders'])}
+    customers = bytearray(columns['customers'])
+    
+    # Records are appended as they stream in, so the parse never holds the file's message dicts
+    for m in messages:
+        sender_id = sender_ids.get(m['sender'])
+        if sender_id is None:
+            sender_id = sender_ids[m['sender']] = len(columns['senders'])
+            columns['senders'].append(m['sender'])
+            customers.append(m['is_customer'])
+        
+        msg_seconds = to_seconds(m['datetime'])
+        if last_seconds is not None and msg_seconds < last_seconds:
+            in_order = False
+        last_seconds = msg_seconds
+        seconds.append(msg_seconds)
+        columns['sender_ids'].append(sender_id)
+        columns['messages'].append(m['message'])
+    columns['customers'] = bytes(customers)
+    
+    # Exports are almost always in time order; the rare out-of-order one (or appended tail) is re-sorted
+    if not in_order:
+        order = sorted(range(len(seconds)), key=seconds.__getitem__)
+        columns['seconds'] = array('q', (seconds[i] for i in order))
+        columns['sender_ids'] = array('I', (columns['sender_ids'][i] for i in order))
+        columns['messages'] = [columns['messages'][i] for i in order]
+    return columns
+
+def _slice_columns(columns, start_date, end_date):
+    """Get (seconds, senders, texts, customer flags) of the messages within date range"""
+    seconds = columns['seconds']
+    first = bisect_left(seconds, to_seconds(start_date))
+    last = bisect_right(seconds, to_seconds(end_date))
+    
+    senders = columns['senders']
+    customers = columns['customers']
+    sender_ids = columns['sender_ids'][first:last]
+    return (
+        seconds[first:last],
+        [senders[i] for i in sender_ids],
+        columns['messages'][first:last],
+        bytes(customers[i] for i in sender_ids)
+    )
\ No newline at end of file
@@ -0,0 +1,93 @@
+from datetime import datetime
+import numpy as np
+
+# Percentiles of response times reported alongside the averages
+PERCENTILES = (50, 90, 99)
+
+def reply_waits(conv_ids, seconds, is_customer):
+    """Get the conversation ids and waits (seconds) of agent replies to customer turns"""
+    if len(seconds) < 2:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+    
+    same_conv = conv_ids[1:] == conv_ids[:-1]
+    # A customer turn starts at a customer message not following another one of the same conversation
+    turn_start = is_customer.copy()
+    turn_start[1:] &= ~(is_customer[:-1] & same_conv)
+    last_turn_start = np.maximum.accumulate(np.where(turn_start, np.arange(len(seconds)), 0))
+    
+    # A reply is the first agent message after a customer turn
+    replies = np.flatnonzero(is_customer[:-1] & ~is_customer[1:] & same_conv) + 1
+    return conv_ids[replies], seconds[replies] - seconds[last_turn_start[replies - 1]]
+
+def first_responses(reply_conv_ids, waits):
+    """Get the wait before the first reply of each answered conversation"""
+    # Replies are in conversation order, so each conversation's first one starts a new id
+    first = np.ones(len(reply_conv_ids), dtype=bool)
+    first[1:] = reply_conv_ids[1:] != reply_conv_ids[:-1]
+    return waits[first]
+
+def conversation_response_times(reply_conv_ids, waits, conversation_count):
+    """Get the average reply wait (seconds) and reply count of every conversation"""
+    counts = np.bincount(reply_conv_ids, minlength=conversation_count)
+    totals = np.bincount(reply_conv_ids, weights=waits, minlength=conversation_count)
+    averages = np.divide(totals, counts, out=np.zeros(conversation_count), where=counts > 0)
+    return averages, counts
+
+def response_metrics(conv_ids, seconds, is_customer, conversation_count, sla_minutes, replies=None):
+    """Compile response times, percentiles and SLA breaches (in minutes) of all conversations at once"""
+    # Callers that also need per-conversation times pass the reply_waits they already computed
+    reply_conv_ids, waits = replies if replies is not None else reply_waits(conv_ids, seconds, is_customer)
+    first_waits = first_responses(reply_conv_ids, waits)
+    waits = waits / 60
+    first_waits = first_waits / 60
+    
+    average = float(waits.mean()) if len(waits) else 0
+    # A quiet period has nothing to rate; conversations left entirely unanswered rate poorly,
+    # rather than as an average of zero minutes
+    if not conversation_count:
+        efficiency = 'no_data'
+    elif not len(waits):
+        efficiency = 'needs_improvement'
+    else:
+        efficiency = 'excellent' if average < 30 else 'good' if average < 60 else 'needs_improvement'
+    return {
+        'average_response_time': average,
+        'average_first_response_time': float(first_waits.mean()) if len(first_waits) else 0,
+        'total_responses': len(waits),
+        'answered_conversations': len(first_waits),
+        'unanswered_conversations': conversation_count - len(first_waits),
+        'percentiles': _percentiles(waits),
+        'first_response_percentiles': _percentiles(first_waits),
+        'sla_minutes': sla_minutes,
+        'sla_breaches': int(np.count_nonzero(waits > sla_minutes)),
+        'first_response_sla_breaches': int(np.count_nonzero(first_waits > sla_minutes)),
+        'response_efficiency': efficiency
+    }
+
+def conversation_arrays(conversations):
+    """Flatten message dict conversations into conversation id, epoch seconds and customer flag arrays"""
+    conv_ids = []
+    seconds = []
+    is_customer = []
+    for conv_id, conv in enumerate(conversations):
+        for msg in conv.get('messages', []):
+            msg_datetime = msg.get('datetime')
+            if isinstance(msg_datetime, str):
+                msg_datetime = datetime.fromisoformat(msg_datetime)
+            if not isinstance(msg_datetime, datetime):
+                continue
+            conv_ids.append(conv_id)
+            seconds.append(int(msg_datetime.timestamp()))
+            # Messages without a flag are the customer's when sent from the conversation's number
+            is_customer.append(bool(msg.get('is_customer', msg.get('sender') == conv.get('customer'))))
+    
+    conv_ids = np.array(conv_ids, dtype=np.int64)
+    seconds = np.array(seconds, dtype=np.int64)
+    order = np.lexsort((seconds, conv_ids))
+    return conv_ids[order], seconds[order], np.array(is_customer, dtype=bool)[order]
+
+def _percentiles(values):
+    """Get the reported percentiles of values, or zeros when there are none"""
+    if not len(values):
+        return {f'p{p}': 0 for p in PERCENTILES}
+    return {f'p{p}': float(v) for p, v in zip(PERCENTILES, np.percentile(values, PERCENTILES))}
\ No newline at end of file
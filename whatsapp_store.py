@@ -0,0 +1,255 @@
+import heapq
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timedelta
+from itertools import repeat
+import numpy as np
+from whatsapp_metrics import reply_waits, response_metrics, conversation_response_times
+
+# Message times are stored as naive seconds since this epoch
+EPOCH = datetime(1970, 1, 1)
+
+class MessageStore:
+    """In-memory WhatsApp messages sorted by time, as shared columns with range and per-sender indexes"""
+    
+    def __init__(self, results=(), chats=None):
+        self.seconds = array('q')
+        self.sender_ids = array('I')
+        # Chat (export file) of each message
+        self.chat_ids = array('I')
+        self.chats = list(chats) if chats is not None else [None] * len(results)
+        # All texts joined, message i spanning text_offsets[i]:text_offsets[i + 1]
+        self.text = ''
+        self.text_offsets = array('q', [0])
+        # Names and customer flags by sender id
+        self.senders = []
+        self.customers = bytearray()
+        # Positions of each sender's messages, in time order
+        self.sender_index = {}
+        
+        sender_ids = {}
+        texts = []
+        # Per-file results are already sorted, so merge instead of re-sorting everything
+        streams = [zip(result[0], repeat(n), range(len(result[0]))) for n, result in enumerate(results)]
+        for msg_seconds, n, i in heapq.merge(*streams):
+            _, senders, file_texts, flags = results[n]
+            sender = senders[i]
+            sender_id = sender_ids.get(sender)
+            if sender_id is None:
+                sender_id = sender_ids[sender] = len(self.senders)
+                self.senders.append(sender)
+                self.customers.append(flags[i])
+                self.sender_index[sender] = array('I')
+            
+            self.sender_index[sender].append(len(self.seconds))
+            self.seconds.append(msg_seconds)
+            self.sender_ids.append(sender_id)
+            self.chat_ids.append(n)
+            texts.append(file_texts[i])
+            self.text_offsets.append(self.text_offsets[-1] + len(file_texts[i]))
+        self.text = ''.join(texts)
+    
+    @classmethod
+    def from_messages(cls, messages):
+        """Build a store from message dicts, one chat per distinct 'chat' value"""
+        by_chat = {}
+        for m in sorted(messages, key=lambda m: m['datetime']):
+            by_chat.setdefault(m.get('chat'), []).append(m)
+        
+        results = [
+            (
+                [to_seconds(m['datetime']) for m in chat_messages],
+                [m['sender'] for m in chat_messages],
+                [m['message'] for m in chat_messages],
+                bytes(bool(m['is_customer']) for m in chat_messages)
+            )
+            for chat_messages in by_chat.values()
+        ]
+        return cls(results, list(by_chat))
+    
+    def __len__(self):
+        return len(self.seconds)
+    
+    def _range(self, start_date, end_date):
+        """Get the positions of messages within date range (inclusive) by bisection"""
+        return (
+            bisect_left(self.seconds, to_seconds(start_date or datetime.min)),
+            bisect_right(self.seconds, to_seconds(end_date or datetime.max))
+        )
+    
+    def is_customer(self, position):
+        """Check if the message at a position was written by a customer"""
+        return self.customers[self.sender_ids[position]]
+    
+    def message(self, position):
+        """Build the message dict of a position"""
+        sender_id = self.sender_ids[position]
+        return {
+            'datetime': EPOCH + timedelta(seconds=self.seconds[position]),
+            'sender': self.senders[sender_id],
+            'message': self.text[self.text_offsets[position]:self.text_offsets[position + 1]],
+            'is_customer': bool(self.customers[sender_id]),
+            'chat': self.chats[self.chat_ids[position]]
+        }
+    
+    def select(self, start_date=None, end_date=None):
+        """Get a view of the messages within date range, without copying them"""
+        first, last = self._range(start_date, end_date)
+        return MessageSlice(self, range(first, last))
+    
+    def get_messages(self, start_date=None, end_date=None, customers_only=False):
+        """Get messages within date range in time order, optionally only customers'"""
+        first, last = self._range(start_date, end_date)
+        return [
+            self.message(position) for position in range(first, last)
+            if not customers_only or self.is_customer(position)
+        ]
+    
+    def get_sender_messages(self, sender, start_date=None, end_date=None):
+        """Get one sender's messages within date range in time order"""
+        positions = self.sender_index.get(sender)
+        if not positions:
+            return []
+        
+        first = bisect_left(positions, to_seconds(start_date or datetime.min), key=self.seconds.__getitem__)
+        last = bisect_right(positions, to_seconds(end_date or datetime.max), key=self.seconds.__getitem__)
+        return [self.message(position) for position in positions[first:last]]
+    
+    def get_customers(self, start_date=None, end_date=None):
+        """Get the customers who wrote within date range"""
+        return self.select(start_date, end_date).customers()
+    
+    def segment(self, positions, gap_seconds):
+        """Group message positions into per-customer conversations in one pass, keeping agent replies"""
+        conversations = []
+        open_conversations = {}
+        last_customer = {}
+        seconds = self.seconds
+        
+        for position in positions:
+            chat_id = self.chat_ids[position]
+            sender_id = self.sender_ids[position]
+            is_customer = self.customers[sender_id]
+            if is_customer:
+                key = (chat_id, sender_id)
+                last_customer[chat_id] = key
+            else:
+                # Agent messages belong to the customer who last wrote in the same chat
+                key = last_customer.get(chat_id)
+                if key is None:
+                    continue
+            
+            # Open conversations are [key, answered, positions]
+            conv = open_conversations.get(key)
+            gap = seconds[position] - seconds[conv[2][-1]] if conv else None
+            
+            if is_customer:
+                # Start new conversation after more than the gap of silence
+                if conv is None or gap > gap_seconds:
+                    conv = open_conversations[key] = [key, False, array('I')]
+                    conversations.append(conv)
+            elif conv is None or (gap > gap_seconds and conv[1]):
+                # Late follow-ups are not replies; late first answers still count for response time
+                continue
+            else:
+                conv[1] = True
+            
+            conv[2].append(position)
+        
+        # Lay conversations out back to back so each one is just a range of the shared order
+        order = array('I')
+        bounds = array('q', [0])
+        keys = []
+        for key, _, conv_positions in conversations:
+            order.extend(conv_positions)
+            bounds.append(len(order))
+            keys.append(key)
+        return Conversations(self, order, bounds, keys)
+
+class MessageSlice:
+    """Read-only sequence over store positions, building message dicts only when accessed"""
+    
+    def __init__(self, store, positions):
+        self.store = store
+        self.positions = positions
+    
+    def __len__(self):
+        return len(self.positions)
+    
+    def __iter__(self):
+        message = self.store.message
+        for position in self.positions:
+            yield message(position)
+    
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return MessageSlice(self.store, self.positions[index])
+        return self.store.message(self.positions[index])
+    
+    def customer_messages(self):
+        """Iterate the customers' messages only"""
+        for position in self.positions:
+            if self.store.is_customer(position):
+                yield self.store.message(position)
+    
+    def customer_count(self):
+        """Count the customers' messages"""
+        return sum(1 for position in self.positions if self.store.is_customer(position))
+    
+    def customers(self):
+        """Get the distinct customers who wrote"""
+        store = self.store
+        return {store.senders[store.sender_ids[p]] for p in self.positions if store.is_customer(p)}
+    
+    def conversations(self, gap_seconds):
+        """Segment these messages into conversations"""
+        return self.store.segment(self.positions, gap_seconds)
+
+class Conversations:
+    """Conversations held as start/end offsets into one shared array of store positions"""
+    
+    def __init__(self, store, order, bounds, keys):
+        self.store = store
+        self.order = order
+        self.bounds = bounds
+        # (chat id, customer sender id) of each conversation
+        self.keys = keys
+    
+    def __len__(self):
+        return len(self.keys)
+    
+    def customer(self, index):
+        """Get the customer of a conversation"""
+        return self.store.senders[self.keys[index][1]]
+    
+    def chat(self, index):
+        """Get the chat of a conversation"""
+        return self.store.chats[self.keys[index][0]]
+    
+    def messages(self, index):
+        """Get a view of a conversation's messages, without copying them"""
+        return MessageSlice(self.store, memoryview(self.order)[self.bounds[index]:self.bounds[index + 1]])
+    
+    def arrays(self):
+        """Get conversation ids, timestamps and customer flags of all messages in conversation order"""
+        order = np.frombuffer(self.order, dtype=np.uint32) if self.order else np.zeros(0, dtype=np.uint32)
+        conv_ids = np.repeat(np.arange(len(self)), np.diff(np.frombuffer(self.bounds, dtype=np.int64)))
+        seconds = np.frombuffer(self.store.seconds, dtype=np.int64)[order]
+        sender_ids = np.frombuffer(self.store.sender_ids, dtype=np.uint32)[order]
+        is_customer = np.frombuffer(bytes(self.store.customers), dtype=np.uint8).astype(bool)[sender_ids]
+        return conv_ids, seconds, is_customer
+    
+    def response_times(self, sla_minutes):
+        """Get overall response metrics, plus the average reply wait (seconds) and reply count of every conversation"""
+        # The arrays and reply waits are computed once for both the totals and each conversation
+        conv_ids, seconds, is_customer = self.arrays()
+        replies = reply_waits(conv_ids, seconds, is_customer)
+        metrics = response_metrics(conv_ids, seconds, is_customer, len(self), sla_minutes, replies)
+        averages, counts = conversation_response_times(*replies, len(self))
+        return metrics, averages, counts
+
+def to_seconds(value):
+    """Convert a date or naive datetime to seconds since EPOCH"""
+    if not isinstance(value, datetime):
+        value = datetime(value.year, value.month, value.day)
+    return int((value - EPOCH).total_seconds())
\ No newline at end of file